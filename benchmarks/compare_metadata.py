@@ -0,0 +1,63 @@
+import argparse
+import copy
+import time
+from typing import Any
+
+from ultima_scraper_api.classes.prepare_metadata import create_metadata
+
+
+def create_metadata_set(post_ids: range, medias_per_post: int = 2):
+    posts: list[dict[str, Any]] = []
+    for post_id in post_ids:
+        medias = [
+            {
+                "media_id": post_id * medias_per_post + index,
+                "links": [f"https://cdn.example.com/files/{post_id}/{index}.jpg?sig=x"],
+                "directory": "",
+                "filename": f"{post_id}_{index}.jpg",
+                "size": 1024,
+                "session": None,
+                "downloaded": False,
+            }
+            for index in range(medias_per_post)
+        ]
+        posts.append(
+            {
+                "post_id": post_id,
+                "text": f"Post {post_id}",
+                "price": 0,
+                "paid": False,
+                "medias": medias,
+                "createdAt": "2023-01-01T00:00:00+00:00",
+            }
+        )
+    return {"version": 2, "content": {"Images": {"valid": posts}}}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks create_metadata.compare_metadata"
+    )
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--overlap", type=float, default=0.9)
+    args = parser.parse_args()
+    new_start = round(args.posts * (1 - args.overlap))
+    old_metadata_set = create_metadata_set(range(0, args.posts))
+    new_metadata_set = create_metadata_set(range(new_start, new_start + args.posts))
+
+    start = time.perf_counter()
+    old_metadata = create_metadata(copy.deepcopy(old_metadata_set))
+    new_metadata = create_metadata(copy.deepcopy(new_metadata_set))
+    loaded = time.perf_counter()
+    result = new_metadata.compare_metadata(old_metadata)
+    compared = time.perf_counter()
+
+    merged_posts = len(result.content.Images.valid)
+    print(f"posts: {args.posts}, overlap: {args.overlap:.0%}")
+    print(f"load: {loaded - start:.2f}s")
+    print(f"compare_metadata: {compared - loaded:.2f}s")
+    print(f"merged posts: {merged_posts}")
+
+
+if __name__ == "__main__":
+    main()
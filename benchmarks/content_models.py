@@ -0,0 +1,77 @@
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from ultima_scraper_api.apis.onlyfans.classes.post_model import create_post
+from ultima_scraper_api.models.content_model import RawField
+
+FIELDS = [
+    (name, value)
+    for cls in create_post.__mro__
+    for name, value in vars(cls).items()
+    if isinstance(value, RawField)
+]
+
+
+class DictPost:
+    """The layout create_post had before, every field copied into __dict__ next to __raw__"""
+
+    def __init__(self, option: dict[str, Any], user: Any) -> None:
+        for name, field in FIELDS:
+            value = option.get(field.key, field.default)
+            if field.default_factory and value is None:
+                value = field.default_factory()
+            setattr(self, name, value)
+        self.id = option["id"]
+        self.author = user
+        self.preview_ids: list[int] = []
+        self.comments: list[Any] = []
+        self.__raw__ = option
+
+
+def create_payload(post_id: int) -> dict[str, Any]:
+    payload: dict[str, Any] = {name: None for name, _field in FIELDS}
+    payload |= {
+        "id": post_id,
+        "responseType": "post",
+        "postedAt": "2023-01-01T00:00:00+00:00",
+        "text": f"Post {post_id}",
+        "rawText": f"Post {post_id}",
+        "mediaCount": 1,
+        "price": 0,
+        "media": [{"id": post_id, "type": "photo", "canView": True}],
+    }
+    return payload
+
+
+def measure(model: Callable[..., Any], payloads: list[dict[str, Any]]):
+    tracemalloc.start()
+    start = time.perf_counter()
+    models = [model(payload, None) for payload in payloads]
+    created = time.perf_counter()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    [(x.text, x.price, x.mediaCount, x.media) for x in models]
+    accessed = time.perf_counter()
+    return size, created - start, accessed - created
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the memory used by content models"
+    )
+    parser.add_argument("--posts", type=int, default=100_000)
+    args = parser.parse_args()
+    payloads = [create_payload(post_id) for post_id in range(args.posts)]
+    print(f"posts: {args.posts}, payloads aren't counted")
+    for name, model in [("__dict__ copy", DictPost), ("create_post", create_post)]:
+        size, create_time, access_time = measure(model, payloads)
+        print(
+            f"{name}: {size / 1024 / 1024:.1f} MiB ({size / args.posts:.0f} B/post),"
+            f" create {create_time:.2f}s, access {access_time:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import hashlib
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+from ultima_scraper_api.managers.dynamic_rules_manager import RequestSigner
+
+RULES = {
+    "static_param": "benchmark",
+    "checksum_indexes": [1, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37],
+    "checksum_constant": 100,
+    "format": "1:{}:{:x}:0",
+}
+
+
+def create_signed_headers(
+    dynamic_rules: dict[str, Any], link: str, auth_id: int, query_auth_id: int
+):
+    """How requests were signed before RequestSigner, everything worked out per request"""
+    headers: dict[str, Any] = {}
+    final_time = str(int(round(time.time())))
+    path = urlparse(link).path
+    query = urlparse(link).query
+    if query:
+        auth_id = query_auth_id
+        headers["user-id"] = str(auth_id)
+    path = path if not query else f"{path}?{query}"
+    message = "\n".join(
+        [dynamic_rules["static_param"], final_time, path, str(auth_id)]
+    ).encode("utf-8")
+    sha_1_sign = hashlib.sha1(message).hexdigest()
+    sha_1_b = sha_1_sign.encode("ascii")
+    checksum = (
+        sum([sha_1_b[number] for number in dynamic_rules["checksum_indexes"]])
+        + dynamic_rules["checksum_constant"]
+    )
+    headers["sign"] = dynamic_rules["format"].format(sha_1_sign, abs(checksum))
+    headers["time"] = final_time
+    return headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks RequestSigner")
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+    links = [
+        f"https://onlyfans.com/api2/v2/users/{index % args.users}/posts?limit=10&offset={index % 20}"
+        for index in range(args.requests)
+    ]
+    signer = RequestSigner(RULES)
+
+    start = time.perf_counter()
+    for link in links:
+        create_signed_headers(RULES, link, 0, 1)
+    baseline = time.perf_counter()
+    for link in links:
+        signer.sign(link, 0, 1)
+    signed = time.perf_counter()
+
+    print(f"requests: {args.requests}, unique links: {args.users * 20}")
+    print(f"per request: {baseline - start:.2f}s")
+    print(f"RequestSigner.sign: {signed - baseline:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
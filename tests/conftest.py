@@ -0,0 +1,63 @@
+import time
+from asyncio import sleep
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import ultima_scraper_api
+from ultima_scraper_api.classes.make_settings import Config
+from ultima_scraper_api.managers.dynamic_rules_manager import DynamicRules
+
+RULES = {
+    "app_token": "test",
+    "static_param": "test",
+    "checksum_indexes": [1, 5, 7, 20],
+    "checksum_constant": 100,
+    "format": "1:{}:{:x}:0",
+    "remove_headers": [],
+}
+
+
+@pytest.fixture
+def config(tmp_path: Any, monkeypatch: pytest.MonkeyPatch):
+    """A Config that keeps its data in tmp_path, with dynamic rules that never hit the network"""
+    config = Config(settings={"data_directory": str(tmp_path)})
+    dynamic_rules = DynamicRules(config.settings.dynamic_rules_link)
+    dynamic_rules.rules = dict(RULES)
+    dynamic_rules.fetched_at = time.time()
+    monkeypatch.setitem(
+        DynamicRules.instances, config.settings.dynamic_rules_link, dynamic_rules
+    )
+    return config
+
+
+@pytest.fixture
+def make_api(config: Config):
+    """Call it inside the event loop, the sessions belong to it"""
+
+    def make_api(site_name: str = "OnlyFans"):
+        return ultima_scraper_api.select_api(site_name, config=config)
+
+    return make_api
+
+
+@pytest.fixture
+def paged():
+    """Makes fake ScrapeManager.fetch_pages that serve items by the limit and offset params"""
+
+    def paged(items: list[Any]):
+        async def fetch_page(url: str, projection: Any = None):
+            query = parse_qs(urlparse(url).query)
+            offset = int(query["offset"][0])
+            limit = int(query["limit"][0])
+            await sleep(0)
+            page = {"list": items[offset : offset + limit]}
+            page["hasMore"] = offset + limit < len(items)
+            if projection:
+                page["list"] = [projection(x) for x in page["list"]]
+            return page
+
+        return fetch_page
+
+    return paged
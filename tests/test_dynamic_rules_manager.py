@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+import pytest
+
+from ultima_scraper_api.managers.dynamic_rules_manager import (
+    DynamicRules,
+    RequestSigner,
+)
+
+RULES = {
+    "static_param": "test",
+    "checksum_indexes": [1, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37],
+    "checksum_constant": 100,
+    "format": "1:{}:{:x}:0",
+}
+
+LINKS = [
+    "https://onlyfans.com/api2/v2/users/me",
+    "https://onlyfans.com/api2/v2/users/1/posts?limit=10&offset=0",
+    "https://onlyfans.com/api2/v2/chats/1/messages?limit=10&order=desc&skip_users=all",
+]
+
+
+def create_signed_headers(
+    dynamic_rules: dict[str, Any],
+    link: str,
+    auth_id: int,
+    query_auth_id: int,
+    final_time: str,
+):
+    """How requests were signed before RequestSigner"""
+    headers: dict[str, Any] = {}
+    path = urlparse(link).path
+    query = urlparse(link).query
+    if query:
+        auth_id = query_auth_id
+        headers["user-id"] = str(auth_id)
+    path = path if not query else f"{path}?{query}"
+    message = "\n".join(
+        [dynamic_rules["static_param"], final_time, path, str(auth_id)]
+    ).encode("utf-8")
+    sha_1_sign = hashlib.sha1(message).hexdigest()
+    sha_1_b = sha_1_sign.encode("ascii")
+    checksum = (
+        sum([sha_1_b[number] for number in dynamic_rules["checksum_indexes"]])
+        + dynamic_rules["checksum_constant"]
+    )
+    headers["sign"] = dynamic_rules["format"].format(sha_1_sign, abs(checksum))
+    headers["time"] = final_time
+    return headers
+
+
+@pytest.mark.parametrize("checksum_indexes", [[], [3], RULES["checksum_indexes"]])
+@pytest.mark.parametrize("link", LINKS)
+def test_signer_matches_per_request_signing(checksum_indexes: list[int], link: str):
+    rules = RULES | {"checksum_indexes": checksum_indexes}
+    signer = RequestSigner(rules)
+    final_time = 1700000000
+    expected = create_signed_headers(rules, link, 0, 123, str(final_time))
+    assert signer.sign(link, 0, 123, final_time) == expected
+    # Cached signing paths don't leak between calls
+    assert signer.sign(link, 0, 123, final_time) == expected
+
+
+def test_signer_falls_back_to_auth_id_for_queries():
+    signer = RequestSigner(RULES)
+    headers = signer.sign(LINKS[1], 5, None, 1700000000)
+    assert headers == create_signed_headers(RULES, LINKS[1], 5, 5, "1700000000")
+    assert "user-id" not in signer.sign(LINKS[0], 5, 6, 1700000000)
+
+
+def test_cached_rules_are_loaded(tmp_path: Path):
+    dynamic_rules = DynamicRules("https://example.com/rules.json", tmp_path)
+    dynamic_rules.rules = dict(RULES)
+    dynamic_rules.fetched_at = time.time()
+    dynamic_rules.save()
+    cached = DynamicRules("https://example.com/rules.json", tmp_path)
+    assert cached.rules == RULES
+    assert cached.is_fresh()
+    assert not DynamicRules("https://example.com/other.json", tmp_path).rules
+    # Nothing is kept without a cache_directory
+    assert DynamicRules("https://example.com/rules.json").filepath is None
+
+
+def test_get_only_fetches_once(monkeypatch: pytest.MonkeyPatch):
+    dynamic_rules = DynamicRules("https://example.com/rules.json")
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0.01)
+        dynamic_rules.rules = dict(RULES)
+        dynamic_rules.fetched_at = time.time()
+        return dynamic_rules.rules
+
+    monkeypatch.setattr(dynamic_rules, "fetch", fetch)
+
+    async def main():
+        results = await asyncio.gather(*[dynamic_rules.get() for _ in range(20)])
+        await dynamic_rules.close()
+        return results
+
+    results = asyncio.run(main())
+    assert fetches == 1
+    assert all(x == RULES for x in results)
+
+
+def test_failed_refresh_backs_off_with_stale_rules(monkeypatch: pytest.MonkeyPatch):
+    dynamic_rules = DynamicRules("https://example.com/rules.json")
+    dynamic_rules.rules = dict(RULES)
+    dynamic_rules.fetched_at = time.time() - dynamic_rules.ttl - 1
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        raise ConnectionError
+
+    monkeypatch.setattr(dynamic_rules, "fetch", fetch)
+
+    async def main():
+        results = await asyncio.gather(*[dynamic_rules.get() for _ in range(20)])
+        # Straight after a failure, nobody waits on another fetch
+        assert dynamic_rules.is_backing_off()
+        results.append(await dynamic_rules.get())
+        await dynamic_rules.close()
+        return results
+
+    results = asyncio.run(main())
+    assert fetches == 1
+    assert all(x == RULES for x in results)
+
+
+def test_failed_first_fetch_raises(monkeypatch: pytest.MonkeyPatch):
+    dynamic_rules = DynamicRules("https://example.com/rules.json")
+
+    async def fetch():
+        raise ConnectionError
+
+    monkeypatch.setattr(dynamic_rules, "fetch", fetch)
+    with pytest.raises(ConnectionError):
+        asyncio.run(dynamic_rules.get())
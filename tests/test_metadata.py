@@ -0,0 +1,160 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from ultima_scraper_api.classes.prepare_metadata import (
+    create_metadata,
+    export_metadata,
+    legacy_metadata_fixer,
+    migrate_metadata,
+)
+from ultima_scraper_api.managers.metadata_manager import MetadataStore
+
+
+def get_post_ids(metadata: create_metadata):
+    return {
+        media_type: {status: [x.post_id for x in posts] for status, posts in statuses}
+        for media_type, statuses in metadata.content
+        if any(posts for _status, posts in statuses)
+    }
+
+
+def write_legacy_metadata(directory: Path):
+    posts_filepath = directory.joinpath("Posts.json")
+    posts_filepath.write_bytes(
+        orjson.dumps(
+            {
+                "version": 2,
+                "content": {
+                    "Images": {
+                        "valid": [
+                            {
+                                "post_id": 1,
+                                "text": "a",
+                                "medias": [
+                                    {
+                                        "media_id": 10,
+                                        "links": ["https://example.com/a.jpg"],
+                                        "directory": "/downloads",
+                                        "filename": "a.jpg",
+                                        "downloaded": True,
+                                    }
+                                ],
+                            }
+                        ]
+                    }
+                },
+            }
+        )
+    )
+    # Version 1, posts are lists of medias
+    messages_filepath = directory.joinpath("Messages.json")
+    messages_filepath.write_bytes(
+        orjson.dumps(
+            {
+                "Videos": {
+                    "valid": [
+                        [
+                            {
+                                "post_id": 5,
+                                "media_id": 50,
+                                "links": ["https://example.com/v.mp4"],
+                                "text": "m",
+                            }
+                        ]
+                    ]
+                }
+            }
+        )
+    )
+    return [posts_filepath, messages_filepath]
+
+
+def create_posts_metadata(post_id: int, media_id: int):
+    return create_metadata(
+        {
+            "version": 2,
+            "content": {
+                "Images": {
+                    "valid": [
+                        {
+                            "post_id": post_id,
+                            "text": "b",
+                            "medias": [
+                                {
+                                    "media_id": media_id,
+                                    "links": ["https://example.com/b.jpg"],
+                                }
+                            ],
+                        }
+                    ]
+                }
+            },
+        }
+    )
+
+
+def test_migrate_metadata(tmp_path: Path):
+    legacy_filepaths = write_legacy_metadata(tmp_path)
+    metadata_filepath = tmp_path.joinpath("user_data.db")
+    metadata, delete_filepaths = migrate_metadata(metadata_filepath, legacy_filepaths)
+    assert sorted(x.name for x in delete_filepaths) == ["Messages.json", "Posts.json"]
+    assert get_post_ids(metadata) == {
+        "Images": {"valid": [1], "invalid": []},
+        "Videos": {"valid": [5], "invalid": []},
+    }
+    with MetadataStore(metadata_filepath) as metadata_store:
+        assert sorted(metadata_store.get_api_types()) == ["Messages", "Posts"]
+        assert metadata_store.get_post_ids("Posts") == {1}
+        exported: dict[str, Any] = metadata_store.export("Posts")
+    media = exported["content"]["Images"]["valid"][0]["medias"][0]
+    assert media["media_id"] == 10
+    assert media["filename"] == "a.jpg"
+    assert media["downloaded"]
+
+    # Migrating again doesn't duplicate anything
+    metadata, _delete_filepaths = migrate_metadata(metadata_filepath, legacy_filepaths)
+    assert get_post_ids(metadata)["Images"]["valid"] == [1]
+
+
+def test_legacy_metadata_fixer_uses_the_store_for_db_files(tmp_path: Path):
+    legacy_filepaths = write_legacy_metadata(tmp_path)
+    metadata, delete_filepaths = asyncio.run(
+        legacy_metadata_fixer(tmp_path.joinpath("user_data.db"), legacy_filepaths)
+    )
+    assert len(delete_filepaths) == 2
+    assert get_post_ids(metadata)["Videos"]["valid"] == [5]
+
+
+def test_export_metadata_upserts_into_db(tmp_path: Path):
+    metadata_filepath = tmp_path.joinpath("user_data.db")
+    migrate_metadata(metadata_filepath, write_legacy_metadata(tmp_path))
+    export_metadata(create_posts_metadata(2, 20), metadata_filepath, "Posts")
+    # Upserting the same post again replaces it
+    export_metadata(create_posts_metadata(2, 20), metadata_filepath, "Posts")
+    metadata, _delete_filepaths = migrate_metadata(metadata_filepath, [])
+    assert get_post_ids(metadata) == {
+        "Images": {"valid": [2, 1], "invalid": []},
+        "Videos": {"valid": [5], "invalid": []},
+    }
+    with MetadataStore(metadata_filepath) as metadata_store:
+        assert metadata_store.get_post_ids("Posts") == {1, 2}
+        assert metadata_store.get_post_ids("Messages") == {5}
+
+
+def test_export_metadata_defaults_api_type_to_filename(tmp_path: Path):
+    metadata_filepath = tmp_path.joinpath("Stories.db")
+    export_metadata(create_posts_metadata(3, 30), metadata_filepath)
+    with MetadataStore(metadata_filepath) as metadata_store:
+        assert metadata_store.get_api_types() == ["Stories"]
+
+
+def test_export_metadata_writes_json(tmp_path: Path):
+    metadata_filepath = tmp_path.joinpath("Posts.json")
+    export_metadata(create_posts_metadata(2, 20), metadata_filepath)
+    exported = orjson.loads(metadata_filepath.read_bytes())
+    post = exported["content"]["Images"]["valid"][0]
+    assert post["post_id"] == 2
+    assert post["medias"][0]["media_id"] == 20
@@ -0,0 +1,144 @@
+import asyncio
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from aiohttp import web
+
+from ultima_scraper_api.managers.scrape_manager import ScrapeError, ScrapeManager
+
+LINK = "https://onlyfans.com/api2/v2/users/1/posts?limit=10&offset=0&order=publish_date_desc"
+
+
+def run_with_scrape_manager(
+    make_api: Callable[..., Any], test: Callable[[ScrapeManager], Any]
+):
+    async def main():
+        api = make_api()
+        auth = api.add_auth({})
+        scrape_manager = ScrapeManager(auth.session_manager)
+        try:
+            return await test(scrape_manager)
+        finally:
+            await api.close_pools()
+
+    return asyncio.run(main())
+
+
+def test_set_page():
+    url = ScrapeManager.set_page(LINK, 5, 15)
+    query = parse_qs(urlparse(url).query)
+    assert query["limit"] == ["5"]
+    assert query["offset"] == ["15"]
+    assert query["order"] == ["publish_date_desc"]
+
+
+def test_extract_page():
+    assert ScrapeManager.extract_page({"list": [1], "hasMore": False}) == ([1], False)
+    assert ScrapeManager.extract_page({"list": [1]}) == ([1], True)
+    assert ScrapeManager.extract_page([1, 2]) == ([1, 2], True)
+    assert ScrapeManager.extract_page([]) == ([], False)
+    assert ScrapeManager.extract_page(None) == ([], False)
+
+
+def test_iter_pages_stops_when_has_more_is_false(
+    make_api: Callable[..., Any], paged: Callable[..., Any]
+):
+    items = [{"id": x} for x in range(95, 0, -1)]
+    requested: list[int] = []
+
+    async def test(scrape_manager: ScrapeManager):
+        fetch_page = paged(items)
+
+        async def counting_fetch_page(url: str, projection: Any = None):
+            requested.append(int(parse_qs(urlparse(url).query)["offset"][0]))
+            return await fetch_page(url, projection)
+
+        scrape_manager.fetch_page = counting_fetch_page
+        pages = [x async for x in scrape_manager.iter_pages(LINK, 10, lookahead=4)]
+        assert [x["id"] for page in pages for x in page] == list(range(95, 0, -1))
+        # Pages past the end are only requested by the lookahead
+        assert max(requested) < 90 + 10 * 4
+
+    run_with_scrape_manager(make_api, test)
+
+
+def test_iter_pages_stops_at_an_empty_page(make_api: Callable[..., Any]):
+    requested: list[int] = []
+
+    async def fetch_page(url: str, projection: Any = None):
+        offset = int(parse_qs(urlparse(url).query)["offset"][0])
+        requested.append(offset)
+        # Bare lists don't say whether there's more
+        return [{"id": offset}] if offset < 30 else []
+
+    async def test(scrape_manager: ScrapeManager):
+        scrape_manager.fetch_page = fetch_page
+        pages = [x async for x in scrape_manager.iter_pages(LINK, 10, lookahead=1)]
+        assert pages == [[{"id": 0}], [{"id": 10}], [{"id": 20}]]
+        assert requested == [0, 10, 20, 30]
+
+    run_with_scrape_manager(make_api, test)
+
+
+def test_iter_pages_cancels_lookahead_when_closed(
+    make_api: Callable[..., Any], paged: Callable[..., Any]
+):
+    items = [{"id": x} for x in range(100)]
+
+    async def test(scrape_manager: ScrapeManager):
+        scrape_manager.fetch_page = paged(items)
+        pages = scrape_manager.iter_pages(LINK, 10, lookahead=5)
+        async for _page in pages:
+            break
+        await pages.aclose()
+        tasks = [x for x in asyncio.all_tasks() if x is not asyncio.current_task()]
+        assert not [x for x in tasks if "fetch_page" in repr(x.get_coro())]
+
+    run_with_scrape_manager(make_api, test)
+
+
+def test_iter_page_ids(make_api: Callable[..., Any], paged: Callable[..., Any]):
+    items = [{"id": x, "text": "x" * 100} for x in range(25)]
+
+    async def test(scrape_manager: ScrapeManager):
+        scrape_manager.fetch_page = paged(items)
+        pages = [x async for x in scrape_manager.iter_page_ids(LINK, 10)]
+        assert pages == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+
+    run_with_scrape_manager(make_api, test)
+
+
+def test_iter_pages_raises_on_error_page(make_api: Callable[..., Any]):
+    async def handler(request: web.Request):
+        offset = int(request.query["offset"])
+        if offset == 10:
+            return web.json_response(
+                {"error": {"code": 0, "message": "Access denied"}}, status=403
+            )
+        return web.json_response({"list": [{"id": offset}], "hasMore": True})
+
+    async def test(scrape_manager: ScrapeManager):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        link = f"http://127.0.0.1:{port}/posts?limit=10&offset=0"
+        scrape_manager.handle_errors = False
+        pages: list[Any] = []
+        try:
+            with pytest.raises(ScrapeError) as exception_info:
+                async for page in scrape_manager.iter_pages(link, 10, lookahead=1):
+                    pages.append(page)
+            assert pages == [[{"id": 0}]]
+            assert exception_info.value.error["message"] == "Access denied"
+            # A single scrape still hands back the error instead of raising
+            result = await scrape_manager.scrape(ScrapeManager.set_page(link, 10, 10))
+            assert "error" in result
+        finally:
+            await runner.cleanup()
+
+    run_with_scrape_manager(make_api, test)
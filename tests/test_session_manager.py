@@ -0,0 +1,177 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from aiohttp import web
+
+from ultima_scraper_api.managers.session_manager import (
+    RequestRetryError,
+    RetryPolicy,
+    RetryState,
+)
+
+
+async def start_server(handler: Callable[[web.Request], Any]):
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def run_with_session_manager(
+    make_api: Callable[..., Any],
+    handler: Callable[[web.Request], Any],
+    test: Callable[..., Any],
+):
+    async def main():
+        runner, base_url = await start_server(handler)
+        api = make_api()
+        auth = api.add_auth({})
+        session_manager = auth.session_manager
+        # No sleeping between attempts
+        session_manager.retry_policy = RetryPolicy(
+            max_attempts=3, base_delay=0, jitter=0
+        )
+        try:
+            return await test(session_manager, base_url)
+        finally:
+            await api.close_pools()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_retry_policy_delay_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+    assert [policy.get_delay(x) for x in range(1, 6)] == [1, 2, 4, 5, 5]
+
+
+def test_retry_policy_strategies():
+    policy = RetryPolicy(status_strategies={404: "retry"})
+    assert policy.get_strategy(404) == "retry"
+    assert policy.get_strategy(403) == "return"
+    assert policy.get_strategy(503) == "retry"
+    assert policy.get_strategy(418) == "raise"
+
+
+def test_request_retries_server_errors(make_api: Callable[..., Any]):
+    statuses = [503, 502]
+
+    async def handler(request: web.Request):
+        if statuses:
+            return web.Response(status=statuses.pop(0))
+        return web.json_response({"ok": True})
+
+    async def test(session_manager: Any, base_url: str):
+        state = RetryState()
+        response = await session_manager.request(f"{base_url}/retry", retry_state=state)
+        async with response:
+            assert await response.json() == {"ok": True}
+        assert state.attempts == 3
+        assert session_manager.retry_counters["retries"] == 2
+
+    run_with_session_manager(make_api, handler, test)
+
+
+def test_request_gives_up_after_max_attempts(make_api: Callable[..., Any]):
+    attempts = 0
+
+    async def handler(request: web.Request):
+        nonlocal attempts
+        attempts += 1
+        return web.Response(status=500)
+
+    async def test(session_manager: Any, base_url: str):
+        with pytest.raises(RequestRetryError) as exception_info:
+            await session_manager.request(f"{base_url}/down")
+        assert exception_info.value.state.attempts == 3
+        assert session_manager.retry_counters["exhausted"] == 1
+        # The failure is reported like an error response
+        result = await session_manager.json_request(f"{base_url}/down")
+        assert result["error"]["code"] == 500
+
+    run_with_session_manager(make_api, handler, test)
+    assert attempts == 6
+
+
+def test_request_returns_client_errors(make_api: Callable[..., Any]):
+    attempts = 0
+
+    async def handler(request: web.Request):
+        nonlocal attempts
+        attempts += 1
+        return web.json_response({"error": {"code": 0, "message": "gone"}}, status=404)
+
+    async def test(session_manager: Any, base_url: str):
+        response = await session_manager.request(f"{base_url}/missing")
+        async with response:
+            assert response.status == 404
+            # The error body is still readable
+            assert (await response.json())["error"]["message"] == "gone"
+
+    run_with_session_manager(make_api, handler, test)
+    assert attempts == 1
+
+
+def test_json_request_coalesces_identical_gets(make_api: Callable[..., Any]):
+    hits: list[str] = []
+    release = asyncio.Event()
+
+    async def handler(request: web.Request):
+        hits.append(request.path)
+        await release.wait()
+        return web.json_response({"list": [{"id": 1}]})
+
+    async def test(session_manager: Any, base_url: str):
+        tasks = [
+            asyncio.create_task(session_manager.json_request(f"{base_url}/{x}"))
+            for x in ["a", "a", "a", "b"]
+        ]
+        while len(hits) < 2:
+            await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert session_manager.coalesced_requests == 2
+        assert not session_manager.in_flight
+        # Every caller gets its own copy
+        results[0]["list"].append({"id": 2})
+        assert results[1] == {"list": [{"id": 1}]}
+
+        # Nothing is shared once the request is done
+        await session_manager.json_request(f"{base_url}/a")
+        assert session_manager.coalesced_requests == 2
+
+        # Opted out
+        session_manager.coalesce_key = None
+        await asyncio.gather(
+            *[session_manager.json_request(f"{base_url}/c") for _ in range(2)]
+        )
+
+    run_with_session_manager(make_api, handler, test)
+    assert sorted(hits) == ["/a", "/a", "/b", "/c", "/c"]
+
+
+def test_json_request_cancelled_caller_keeps_shared_request(
+    make_api: Callable[..., Any],
+):
+    release = asyncio.Event()
+
+    async def handler(request: web.Request):
+        await release.wait()
+        return web.json_response({"id": 1})
+
+    async def test(session_manager: Any, base_url: str):
+        url = f"{base_url}/shared"
+        first = asyncio.create_task(session_manager.json_request(url))
+        second = asyncio.create_task(session_manager.json_request(url))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        release.set()
+        assert await second == {"id": 1}
+        assert first.cancelled()
+
+    run_with_session_manager(make_api, handler, test)
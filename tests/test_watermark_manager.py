@@ -0,0 +1,115 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from ultima_scraper_api.managers.scrape_manager import ScrapeError
+from ultima_scraper_api.managers.watermark_manager import WatermarkManager
+
+
+def test_update_only_moves_forward():
+    watermark_manager = WatermarkManager()
+    assert watermark_manager.update(1, "Posts", 10)
+    assert not watermark_manager.update(1, "Posts", 5)
+    assert not watermark_manager.update(1, "Posts", 10)
+    assert not watermark_manager.update(1, "Posts", None)
+    # postedAtPrecise comes as a string
+    assert watermark_manager.update(1, "Posts", "10.5")
+    assert watermark_manager.get(1, "Posts") == "10.5"
+
+
+def test_watermarks_are_keyed_by_auth():
+    watermark_manager = WatermarkManager()
+    watermark_manager.update(1, "Messages", 10, auth_id=100)
+    assert watermark_manager.get(1, "Messages", 100) == 10
+    assert watermark_manager.get(1, "Messages", 200) is None
+    assert watermark_manager.get(1, "Messages") is None
+    assert WatermarkManager.get_key(1, 100) == "100:1"
+    assert WatermarkManager.get_key(1) == "1"
+
+
+def test_set_and_reset():
+    watermark_manager = WatermarkManager()
+    watermark_manager.set(1, "PaidContent", [["Post", 2], ["Message", 1]], 1)
+    watermark_manager.set(1, "PaidContent", [["Post", 3]], 1)
+    assert watermark_manager.get(1, "PaidContent", 1) == [["Post", 3]]
+    watermark_manager.update(1, "Posts", 10, 1)
+    watermark_manager.reset(1, "Posts", 1)
+    assert watermark_manager.get(1, "Posts", 1) is None
+    assert watermark_manager.get(1, "PaidContent", 1) == [["Post", 3]]
+    watermark_manager.reset(1, auth_id=1)
+    assert watermark_manager.get(1, "PaidContent", 1) is None
+
+
+def test_save_and_load(tmp_path: Path):
+    filepath = tmp_path.joinpath("watermarks", "onlyfans.json")
+    WatermarkManager(filepath).save()
+    watermark_manager = WatermarkManager(filepath)
+    watermark_manager.update(1, "Posts", "1700000000.000000", 100)
+    watermark_manager.save()
+    assert WatermarkManager(filepath).get(1, "Posts", 100) == "1700000000.000000"
+    # Nowhere to save to
+    WatermarkManager().save()
+
+
+def test_watermark_lives_in_data_directory(
+    make_api: Callable[..., Any], tmp_path: Path
+):
+    async def main():
+        api = make_api()
+        await api.close_pools()
+        return api.watermark_manager.filepath
+
+    filepath = asyncio.run(main())
+    assert filepath == tmp_path.joinpath("watermarks", "onlyfans.json")
+
+
+def test_get_new_messages(make_api: Callable[..., Any], paged: Callable[..., Any]):
+    messages = [
+        {"id": x, "text": "", "fromUser": {"id": 55}} for x in range(100, 0, -1)
+    ]
+
+    async def main():
+        from ultima_scraper_api.apis.onlyfans.classes.user_model import create_user
+
+        api = make_api()
+        watermark_manager = api.watermark_manager
+        auth = api.add_auth({})
+        auth.id = 1
+        user = create_user({"id": 55, "username": "test"}, auth)
+        fetch_page = paged(messages)
+        user.scrape_manager.fetch_page = fetch_page
+        try:
+            results = await user.get_new_messages(10)
+            assert len(results) == 100
+            assert watermark_manager.get(55, "Messages", 1) == 100
+
+            # Only what's newer than the watermark
+            messages[:0] = [
+                {"id": x, "text": "", "fromUser": {"id": 55}}
+                for x in range(130, 100, -1)
+            ]
+
+            async def failing_fetch_page(url: str, projection: Any = None):
+                if parse_qs(urlparse(url).query)["offset"] == ["10"]:
+                    raise ScrapeError(url, {"code": 500, "message": "error"})
+                return await fetch_page(url, projection)
+
+            # A crawl that didn't finish leaves the watermark where it was
+            user.scrape_manager.fetch_page = failing_fetch_page
+            with pytest.raises(ScrapeError):
+                await user.get_new_messages(10)
+            assert watermark_manager.get(55, "Messages", 1) == 100
+
+            user.scrape_manager.fetch_page = fetch_page
+            results = await user.get_new_messages(10)
+            assert [x.id for x in results] == list(range(130, 100, -1))
+            assert watermark_manager.get(55, "Messages", 1) == 130
+            saved = WatermarkManager(watermark_manager.filepath)
+            assert saved.get(55, "Messages", 1) == 130
+        finally:
+            await api.close_pools()
+
+    asyncio.run(main())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import inspect
+import sys
 from argparse import Namespace
 from multiprocessing import cpu_count
 from multiprocessing.dummy import Pool as ThreadPool
@@ -88,7 +88,7 @@ async def get_function_name(
     function_that_called: str = "", convert_to_api_type: bool = False
 ):
     if not function_that_called:
-        function_that_called = inspect.stack()[1].function
+        function_that_called = sys._getframe(1).f_code.co_name
     if convert_to_api_type:
         return function_that_called.split("_")[-1].capitalize()
     return function_that_called
@@ -120,11 +120,23 @@ async def handle_refresh(
 
 
 async def default_data(
-    api: auth_types | user_types, refresh: bool = False, api_type: str = ""
+    api: auth_types | user_types,
+    refresh: bool = False,
+    api_type: str = "",
+    function_that_called: str = "",
 ):
+    """Returns the already scraped data when a get_* method doesn't need to fetch
+
+    Args:
+        function_that_called (str, optional): Name of the get_* method asking, e.g. "get_posts". Pass it in, looking it up from the caller's frame is only a fallback.
+
+    Returns:
+        tuple[list[Any], bool]: The data and whether it should be used instead of fetching
+    """
     status: bool = False
     result: list[Any] = []
-    function_that_called = inspect.stack()[1].function
+    if not function_that_called:
+        function_that_called = sys._getframe(1).f_code.co_name
     auth_types = ultima_scraper_api.auth_types
 
     if isinstance(api, auth_types):
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import ultima_scraper_api
 from ultima_scraper_api.apis import api_helper
 from ultima_scraper_api.classes.make_settings import Config
+from ultima_scraper_api.managers.bandwidth_manager import BandwidthGovernor
+from ultima_scraper_api.managers.cache_manager import ResponseCache
+from ultima_scraper_api.managers.dedup_manager import DedupIndex
+from ultima_scraper_api.managers.proxy_manager import ProxyPool
+from ultima_scraper_api.managers.session_manager import ConnectionPool
+from ultima_scraper_api.managers.watermark_manager import WatermarkManager
 
 if TYPE_CHECKING:
     api_types = ultima_scraper_api.api_types
@@ -49,8 +56,41 @@ class StreamlinedAPI:
         self.config = config
         self.lists = None
         self.pool = api_helper.CustomPool()
+        network_settings = config.settings.network
+        self.connection_pool = ConnectionPool(
+            network_settings.max_connections,
+            network_settings.max_connections_per_host,
+            network_settings.keepalive_timeout,
+            network_settings.dns_cache_ttl,
+            network_settings.share_connections,
+        )
+        self.proxy_pool = ProxyPool(
+            config.settings.proxies,
+            self.connection_pool,
+            check_interval=network_settings.proxy_check_interval,
+            quarantine_time=network_settings.proxy_quarantine_time,
+        )
 
-        self.job_manager = JobManager()
+        bandwidth_settings = config.settings.bandwidth
+        self.bandwidth_governor = BandwidthGovernor(
+            bandwidth_settings.max_bytes_per_second,
+            bandwidth_settings.max_bytes_per_second_per_host,
+            bandwidth_settings.max_connections_per_host,
+            bandwidth_settings.auth_weights,
+        )
+        # Opt-in, see enable_response_cache
+        self.response_cache: ResponseCache | None = None
+        # Opt-in, see enable_dedup_index
+        self.dedup_index: DedupIndex | None = None
+        self.watermark_manager = WatermarkManager(
+            self.get_data_directory().joinpath(
+                "watermarks", f"{self.api.site_name.lower()}.json"
+            )
+        )
+        job_settings = config.settings.jobs
+        self.job_manager = JobManager(
+            job_settings.max_workers, job_settings.max_jobs_per_auth
+        )
         self.packages = Packages(self.api.site_name)
 
     async def login(self, auth_json: dict[str, Any] = {}, guest: bool = False):
@@ -96,6 +136,36 @@ class StreamlinedAPI:
     def get_global_settings(self):
         return self.config.settings
 
+    def get_data_directory(self):
+        return Path(self.get_global_settings().data_directory)
+
+    def enable_response_cache(self, **kwargs: Any):
+        """Caches json_request responses in the data directory, kwargs go to ResponseCache"""
+        if not self.response_cache:
+            self.response_cache = ResponseCache(
+                self.get_data_directory().joinpath("cache", "responses.db"), **kwargs
+            )
+        return self.response_cache
+
+    def enable_dedup_index(self, **kwargs: Any):
+        """Indexes downloads in the data directory, kwargs go to DedupIndex"""
+        if not self.dedup_index:
+            self.dedup_index = DedupIndex(
+                self.get_data_directory().joinpath("cache", "dedup.db"), **kwargs
+            )
+        return self.dedup_index
+
     async def close_pools(self):
         for auth in self.api.auths:
-            await auth.session_manager.active_session.close()
+            await auth.session_manager.close()
+        # Shared with other apis on the same link, the next get() starts refreshing again
+        for dynamic_rules_manager in {
+            x.session_manager.dynamic_rules_manager for x in self.api.auths
+        }:
+            await dynamic_rules_manager.close()
+        await self.proxy_pool.close()
+        await self.connection_pool.close()
+        if self.response_cache:
+            self.response_cache.close()
+        if self.dedup_index:
+            self.dedup_index.close()
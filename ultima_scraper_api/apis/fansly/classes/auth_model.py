@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime
-from itertools import chain, product
+from itertools import chain
 from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
 from dateutil.relativedelta import relativedelta
@@ -18,6 +17,7 @@ from ultima_scraper_api.apis.fansly.classes.post_model import create_post
 from ultima_scraper_api.apis.fansly.classes.subscription_model import SubscriptionModel
 from ultima_scraper_api.apis.fansly.classes.user_model import create_user
 from ultima_scraper_api.managers.session_manager import SessionManager
+from ultima_scraper_api.managers.user_registry import UserRegistry
 from user_agent import generate_user_agent
 from ultima_scraper_api.apis.fansly import SubscriptionType
 
@@ -27,6 +27,9 @@ if TYPE_CHECKING:
 
 from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
+# Accounts fetched per /account request by get_users
+USERS_PER_REQUEST = 50
+
 
 class create_auth(create_user):
     def __init__(
@@ -37,7 +40,7 @@ class create_auth(create_user):
         auth_details: AuthDetails = AuthDetails(),
     ) -> None:
         self.api = api
-        self.users: set[create_user] = set()
+        self.users: UserRegistry[create_user] = UserRegistry(api.users)
         self.auth_details = auth_details
         self.session_manager = self._SessionManager(self, max_threads=max_threads)
         create_user.__init__(self, option, self)
@@ -89,6 +92,8 @@ class create_auth(create_user):
             found_attr = hasattr(self, key)
             if found_attr:
                 setattr(self, key, value)
+        # id and username usually change here, reindex so lookups find the auth
+        self.users.add(self)
 
     async def login(self, max_attempts: int = 10, guest: bool = False):
         auth_items = self.auth_details
@@ -98,7 +103,7 @@ class create_auth(create_user):
             auth_items.user_agent = generate_user_agent()
         link = endpoint_links().customer
         user_agent = auth_items.user_agent
-        dynamic_rules = self.session_manager.dynamic_rules
+        dynamic_rules = await self.session_manager.get_dynamic_rules()
         a: list[Any] = [dynamic_rules, user_agent, link]
         self.session_manager.headers = create_headers(*a)
         if guest:
@@ -153,8 +158,9 @@ class create_auth(create_user):
                 continue
             else:
                 break
-        if not self.active:
-            user = await self.get_user(self.id)
+        if not self.active and self.id:
+            # Fansly sends ids as strings, get_user takes ids as int
+            user = await self.get_user(int(self.id))
             if isinstance(user, create_user):
                 self.update(user.__dict__)
         return self
@@ -202,7 +208,9 @@ class create_auth(create_user):
         self.errors.append(error)
 
     async def get_lists(self, refresh: bool = True, limit: int = 100, offset: int = 0):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_lists"
+        )
         if status:
             return result
         link = endpoint_links(global_limit=limit, global_offset=offset).lists
@@ -234,23 +242,62 @@ class create_auth(create_user):
             return False
 
     def find_user_by_identifier(self, identifier: int | str):
-        user = [x for x in self.users if x.id == identifier or x.username == identifier]
-        if user:
-            user = user[0]
-            return user
+        return self.users.find(identifier)
 
     async def get_user(self, identifier: int | str):
         valid_user = self.find_user_by_identifier(identifier)
         if valid_user:
             return valid_user
         else:
-            link = endpoint_links(identifier).users
+            link = endpoint_links().list_users([identifier])
             response = await self.session_manager.json_request(link)
             if "error" not in response:
-                response["session_manager"] = self.session_manager
-                response = create_user(response, self)
+                accounts: list[dict[str, Any]] = response.get("response", [])
+                if not accounts:
+                    return {
+                        "error": {"code": 404, "message": f"{identifier} not found"}
+                    }
+                response = create_user(accounts[0], self)
             return response
 
+    async def get_users(self, identifiers: list[int | str]):
+        """Looks up many users at once, known users come from the registry and the rest are fetched USERS_PER_REQUEST at a time
+
+        Ids are ints and usernames are strs, a str of digits is a username.
+
+        Returns:
+            dict[int | str, create_user]: Identifier: user, for the identifiers that were found
+        """
+        found_users: dict[int | str, create_user] = {}
+        missing_ids: list[int] = []
+        missing_usernames: list[str] = []
+        for identifier in dict.fromkeys(identifiers):
+            user = self.find_user_by_identifier(str(identifier))
+            if user:
+                found_users[identifier] = user
+            elif isinstance(identifier, int):
+                missing_ids.append(identifier)
+            else:
+                missing_usernames.append(identifier)
+        # The endpoint takes either ids or usernames
+        batches = [
+            missing[index : index + USERS_PER_REQUEST]
+            for missing in [missing_ids, missing_usernames]
+            for index in range(0, len(missing), USERS_PER_REQUEST)
+        ]
+        links = [endpoint_links().list_users(batch) for batch in batches]
+        responses = await self.session_manager.bulk_json_requests(links)
+        for batch, response in zip(batches, responses):
+            if "error" in response:
+                continue
+            for account in response.get("response", []):
+                create_user(account, self)
+            for identifier in batch:
+                user = self.find_user_by_identifier(str(identifier))
+                if user:
+                    found_users[identifier] = user
+        return found_users
+
     async def get_lists_users(
         self,
         identifier: int | str,
@@ -330,7 +377,9 @@ class create_auth(create_user):
         identifiers: list[int | str] = [],
         sub_type: SubscriptionType = "all",
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_subscriptions"
+        )
         if status:
             result: list[SubscriptionModel]
             return result
@@ -338,9 +387,9 @@ class create_auth(create_user):
         temp_subscriptions = await self.session_manager.json_request(subscriptions_link)
         raw_subscriptions = temp_subscriptions["response"]["subscriptions"]
 
-        async def assign_user_to_sub(raw_subscription: Dict[str, Any]):
-            user = await self.get_user(raw_subscription["accountId"])
-            if isinstance(user, dict):
+        def assign_user_to_sub(raw_subscription: Dict[str, Any]):
+            user = users.get(int(raw_subscription["accountId"]))
+            if not user:
                 user = create_user(raw_subscription, self)
                 user.active = False
             subscription_model = SubscriptionModel(raw_subscription, user, self)
@@ -358,9 +407,10 @@ class create_auth(create_user):
                         found_raw_subscriptions.append(raw_subscription)
                         break
             raw_subscriptions = found_raw_subscriptions
-        with self.get_pool() as pool:
-            tasks = pool.starmap(assign_user_to_sub, product(raw_subscriptions))
-            subscriptions: list[SubscriptionModel] = await asyncio.gather(*tasks)
+        users = await self.get_users([int(x["accountId"]) for x in raw_subscriptions])
+        subscriptions: list[SubscriptionModel] = [
+            assign_user_to_sub(x) for x in raw_subscriptions
+        ]
 
         match sub_type:
             case "all":
@@ -385,7 +435,9 @@ class create_auth(create_user):
         depth: int = 1,
         refresh: bool = True,
     ) -> list[dict[str, Any]]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_chats"
+        )
         if status:
             return result
         multiplier = self.session_manager.max_threads
@@ -439,7 +491,9 @@ class create_auth(create_user):
         limit: int = 10,
         offset: int = 0,
     ) -> list[dict[str, Any]]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_mass_messages"
+        )
         if status:
             return result
         link = endpoint_links(
@@ -142,7 +142,7 @@ class endpoint_links(object):
         self.collection_api = f"{full_url_path}/uservault/album/content?albumId={identifier}&before={global_offset}&after=0&limit={global_limit}"
         self.archived_posts = f"https://onlyfans.com/api2/v2/users/{identifier}/posts/archived?limit={global_limit}&offset={global_offset}&order=publish_date_desc"
         self.archived_stories = f"https://onlyfans.com/api2/v2/stories/archive/?limit=100&offset=0&order=publish_date_desc"
-        self.paid_api = f"https://onlyfans.com/api2/v2/posts/paid?{global_limit}&offset={global_offset}"
+        self.paid_api = f"https://onlyfans.com/api2/v2/posts/paid?limit={global_limit}&offset={global_offset}"
         self.pay = f"https://onlyfans.com/api2/v2/payments/pay"
         self.subscribe = f"https://onlyfans.com/api2/v2/users/{identifier}/subscribe"
         self.like = f"https://onlyfans.com/api2/v2/{identifier}/{identifier2}/like"
@@ -158,7 +158,7 @@ class endpoint_links(object):
 
     def list_users(self, identifiers: list[int | str] | list[int] | list[str]):
         identifier_type = "ids"
-        if all(isinstance(x, str) and x.isalpha() for x in identifiers):
+        if all(isinstance(x, str) for x in identifiers):
             identifier_type = "usernames"
         link = ""
         if identifiers:
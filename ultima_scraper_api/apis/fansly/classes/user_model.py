@@ -16,6 +16,7 @@ from ultima_scraper_api.apis.fansly.classes.hightlight_model import create_highl
 from ultima_scraper_api.apis.fansly.classes.story_model import create_story
 from ultima_scraper_api.apis.user_streamliner import StreamlinedUser
 from ultima_scraper_api.managers.scrape_manager import ScrapeManager
+from ultima_scraper_api.managers.session_manager import decode_json
 
 if TYPE_CHECKING:
     from ultima_scraper_api.apis.fansly.classes.auth_model import create_auth
@@ -252,7 +253,9 @@ class create_user(StreamlinedUser):
     async def get_stories(
         self, refresh: bool = True, limit: int = 100, offset: int = 0
     ) -> list[create_story]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_stories"
+        )
         if status:
             return result
         link = [
@@ -299,10 +302,18 @@ class create_user(StreamlinedUser):
         limit: int = 10,
         offset: int = 0,
         refresh: bool = True,
+        incremental: bool = False,
     ) -> list[create_post]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_posts"
+        )
         if status:
             return result
+        watermark_manager = self.get_api().watermark_manager
+        auth_id = self.get_authed().id
+        since: Optional[int] = (
+            watermark_manager.get(self.id, "Posts", auth_id) if incremental else None
+        )
         temp_results: list[Any] = []
         while True:
             link = endpoint_links(identifier=self.id, global_offset=offset).post_api
@@ -312,6 +323,13 @@ class create_user(StreamlinedUser):
             if not temp_posts:
                 break
             offset = temp_posts[-1]["id"]
+            if since is not None:
+                new_posts = [x for x in temp_posts if int(x["id"]) > since]
+                data["posts"] = new_posts
+                temp_results.append(data)
+                if len(new_posts) < len(temp_posts):
+                    break
+                continue
             temp_results.append(data)
         results = api_helper.merge_dictionaries(temp_results)
         final_results = []
@@ -320,6 +338,10 @@ class create_user(StreamlinedUser):
                 post_model.create_post(x, self, results) for x in results["posts"]
             ]
             self.scrape_manager.scraped.Posts = final_results
+        if incremental and final_results:
+            newest = max(x.id for x in final_results)
+            watermark_manager.update(self.id, "Posts", newest, auth_id)
+            watermark_manager.save()
         return final_results
 
     async def get_post(
@@ -354,10 +376,19 @@ class create_user(StreamlinedUser):
         before: str = "",
         refresh: bool = True,
         inside_loop: bool = False,
+        incremental: bool = False,
+        since: Optional[int] = None,
     ) -> list[Any]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_messages"
+        )
         if status:
             return result
+        watermark_manager = self.get_api().watermark_manager
+        # Chats belong to the auth, another auth's watermark says nothing about this one
+        auth_id = self.get_authed().id
+        if incremental and not inside_loop:
+            since = watermark_manager.get(self.id, "Messages", auth_id)
         groups = await self.get_groups()
         if isinstance(groups, ErrorDetails):
             return []
@@ -380,24 +411,34 @@ class create_user(StreamlinedUser):
             links.append(link)
 
             results = await self.get_session_manager().bulk_requests(links)
-            results = [await x.json() for x in results if x]
+            results = [decode_json(await x.read()) for x in results if x]
             results = await api_helper.remove_errors(results)
             results = api_helper.merge_dictionaries(results)
             if not results:
                 return []
             extras = results["response"]
             final_results = extras["messages"]
+            reached_since = False
+            if since is not None:
+                new_results = [x for x in final_results if int(x["id"]) > since]
+                reached_since = len(new_results) < len(final_results)
+                final_results = new_results
 
-            if final_results:
+            if final_results and not reached_since:
                 lastId = final_results[-1]["id"]
                 results2 = await self.get_messages(
                     links=[links[-1]],
                     limit=limit,
                     before=lastId,
                     inside_loop=True,
+                    since=since,
                 )
                 final_results.extend(results2)
             if not inside_loop:
+                if incremental and final_results:
+                    newest = max(int(x["id"]) for x in final_results)
+                    watermark_manager.update(self.id, "Messages", newest, auth_id)
+                    watermark_manager.save()
                 final_results = [
                     message_model.create_message(x, self, extras)
                     for x in final_results
@@ -428,7 +469,9 @@ class create_user(StreamlinedUser):
     async def get_archived_stories(
         self, refresh: bool = True, limit: int = 100, offset: int = 0
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_archived_stories"
+        )
         if status:
             return result
         link = endpoint_links(global_limit=limit, global_offset=offset).archived_stories
@@ -444,7 +487,9 @@ class create_user(StreamlinedUser):
         limit: int = 10,
         offset: int = 0,
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_archived_posts"
+        )
         if status:
             return result
         if links is None:
@@ -5,6 +5,7 @@ from ultima_scraper_api.apis.fansly.classes.auth_model import create_auth
 from ultima_scraper_api.apis.fansly.classes.extras import AuthDetails, endpoint_links
 from ultima_scraper_api.apis.fansly.classes.user_model import create_user
 from ultima_scraper_api.classes.make_settings import Config
+from ultima_scraper_api.managers.user_registry import UserRegistry
 
 
 class FanslyAPI(StreamlinedAPI):
@@ -12,7 +13,7 @@ class FanslyAPI(StreamlinedAPI):
         self.site_name: Literal["Fansly"] = "Fansly"
         StreamlinedAPI.__init__(self, self, config)
         self.auths: list[create_auth] = []
-        self.users: dict[int, create_user] = {}
+        self.users: UserRegistry[create_user] = UserRegistry()
         self.endpoint_links = endpoint_links
 
     def get_auth(self, identifier: Union[str, int]) -> Optional[create_auth]:
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Literal
 from urllib.parse import urlparse
 
+from ultima_scraper_api.models.content_model import RawField
+
 SubscriptionType = Literal["all", "active", "expired", "attention"]
 
 if TYPE_CHECKING:
@@ -13,12 +15,34 @@ if TYPE_CHECKING:
 
 
 class SiteContent:
+    # Fields are read from __raw__ (see RawField), __dict__ is only created if something sets an unknown attribute
+    __slots__ = ("__raw__", "__overrides__", "id", "author", "preview_ids", "__dict__")
+
+    media = RawField[list[dict[str, Any]]]("media", default_factory=list)
+
     def __init__(self, option: dict[str, Any], user: create_auth | create_user) -> None:
+        self.__raw__ = option
+        self.__overrides__: dict[str, Any] | None = None
         self.id: int = option["id"]
         self.author = user
-        self.media: list[dict[str, Any]] = option.get("media", [])
         self.preview_ids: list[int] = []
 
+    def to_dict(self) -> dict[str, Any]:
+        """The model's attributes, what main_helper.object_to_json writes since slots leave no __dict__
+
+        Fields are read through their RawField, so they're under the attribute's name and converted like any other read.
+        """
+        result: dict[str, Any] = {}
+        for cls in reversed(type(self).__mro__):
+            for name, value in vars(cls).items():
+                if isinstance(value, RawField):
+                    result[name] = getattr(self, name)
+            for name in vars(cls).get("__slots__", ()):
+                if name not in ("__dict__", "__overrides__") and hasattr(self, name):
+                    result[name] = getattr(self, name)
+        result.update(self.__dict__)
+        return result
+
     def url_picker(self, media_item: dict[str, Any], video_quality: str = ""):
         authed = self.get_author().get_authed()
         video_quality = (
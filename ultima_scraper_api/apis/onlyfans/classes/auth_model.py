@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import math
-from itertools import chain, product
-from typing import TYPE_CHECKING, Any, Dict, Optional
+import warnings
+from contextlib import aclosing
+from itertools import chain
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, Optional
 
 from ultima_scraper_api.apis import api_helper
 from ultima_scraper_api.apis.onlyfans.classes.extras import (
@@ -16,6 +18,7 @@ from ultima_scraper_api.apis.onlyfans.classes.message_model import create_messag
 from ultima_scraper_api.apis.onlyfans.classes.post_model import create_post
 from ultima_scraper_api.apis.onlyfans.classes.user_model import create_user
 from ultima_scraper_api.managers.session_manager import SessionManager
+from ultima_scraper_api.managers.user_registry import UserRegistry
 from user_agent import generate_user_agent
 from ultima_scraper_api.apis.onlyfans import SubscriptionType
 from ultima_scraper_api.apis.onlyfans.classes.subscription_model import (
@@ -26,6 +29,9 @@ if TYPE_CHECKING:
     from ultima_scraper_api.apis.onlyfans.classes.only_drm import OnlyDRM
     from ultima_scraper_api.apis.onlyfans.onlyfans import OnlyFansAPI
 
+# Keys create_user needs for scraping, user payloads without them have to be refetched
+REQUIRED_USER_KEYS = ["postsCount", "archivedPostsCount", "mediasCount"]
+
 # auth_model.py handles functions that only relate to the authenticated user
 # We can create a auth_streamliner that has a parent class of create_user instead
 
@@ -39,7 +45,7 @@ class create_auth(create_user):
         auth_details: AuthDetails = AuthDetails(),
     ) -> None:
         self.api = api
-        self.users: set[create_user] = set()
+        self.users: UserRegistry[create_user] = UserRegistry(api.users)
         self.auth_details = auth_details
         self.session_manager = self._SessionManager(self, max_threads=max_threads)
         create_user.__init__(self, option, self)
@@ -89,6 +95,8 @@ class create_auth(create_user):
             found_attr = hasattr(self, key)
             if found_attr:
                 setattr(self, key, value)
+        # id and username usually change here, reindex so lookups find the auth
+        self.users.add(self)
 
     async def login(self, max_attempts: int = 10, guest: bool = False):
         auth_items = self.auth_details
@@ -101,7 +109,7 @@ class create_auth(create_user):
         user_agent = auth_items.user_agent
         auth_id = str(auth_items.cookie.auth_id)
         # expected string error is fixed by auth_id
-        dynamic_rules = self.session_manager.dynamic_rules
+        dynamic_rules = await self.session_manager.get_dynamic_rules()
         a: list[Any] = [dynamic_rules, auth_id, auth_items.x_bc, user_agent, link]
         self.session_manager.headers = create_headers(*a)
         if guest:
@@ -202,7 +210,9 @@ class create_auth(create_user):
         self.errors.append(error)
 
     async def get_lists(self, refresh: bool = True, limit: int = 100, offset: int = 0):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_lists"
+        )
         if status:
             return result
         link = endpoint_links(global_limit=limit, global_offset=offset).lists
@@ -233,10 +243,7 @@ class create_auth(create_user):
             return False
 
     def find_user_by_identifier(self, identifier: int | str):
-        user = [x for x in self.users if x.id == identifier or x.username == identifier]
-        if user:
-            user = user[0]
-            return user
+        return self.users.find(identifier)
 
     async def get_user(self, identifier: int | str):
         valid_user = self.find_user_by_identifier(identifier)
@@ -250,6 +257,35 @@ class create_auth(create_user):
                 response = create_user(response, self)
             return response
 
+    async def get_users(self, identifiers: list[int | str]):
+        """Looks up many users at once, known users come from the registry
+
+        OnlyFans has no endpoint for several users, so the rest are looked up one by one, max_threads at a time.
+
+        Returns:
+            dict[int | str, create_user]: Identifier: user, for the identifiers that were found
+        """
+        found_users: dict[int | str, create_user] = {}
+        missing_identifiers: list[int | str] = []
+        for identifier in dict.fromkeys(identifiers):
+            user = self.find_user_by_identifier(identifier)
+            if user:
+                found_users[identifier] = user
+            else:
+                missing_identifiers.append(identifier)
+        semaphore = asyncio.Semaphore(self.session_manager.max_threads)
+
+        async def lookup(identifier: int | str):
+            async with semaphore:
+                return identifier, await self.get_user(identifier)
+
+        for identifier, user in await asyncio.gather(
+            *[lookup(x) for x in missing_identifiers]
+        ):
+            if isinstance(user, create_user):
+                found_users[identifier] = user
+        return found_users
+
     async def get_lists_users(
         self,
         identifier: int | str,
@@ -257,7 +293,9 @@ class create_auth(create_user):
         limit: int = 100,
         offset: int = 0,
     ):
-        result, status = await api_helper.default_data(self, refresh=True)
+        result, status = await api_helper.default_data(
+            self, refresh=True, function_that_called="get_lists_users"
+        )
         if status:
             return result
         link = endpoint_links(
@@ -296,7 +334,9 @@ class create_auth(create_user):
         limit: int = 20,
         sub_type: SubscriptionType = "all",
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_subscriptions"
+        )
         if status:
             result: list[SubscriptionModel]
             return result
@@ -329,29 +369,40 @@ class create_auth(create_user):
             for raw_subscription in temp_raw_subscriptions
         ]
 
+        # The subscription payload is the user's payload, only users missing what we scrape with are refetched
+        semaphore = asyncio.Semaphore(self.session_manager.max_threads)
+
         async def assign_user_to_sub(raw_subscription: Dict[str, Any]):
-            user = await self.get_user(raw_subscription["username"])
-            if isinstance(user, dict):
-                user = create_user(raw_subscription, self)
-                user.active = False
+            user = self.find_user_by_identifier(raw_subscription["id"])
+            if not user:
+                if all(key in raw_subscription for key in REQUIRED_USER_KEYS):
+                    user = create_user(raw_subscription, self)
+                else:
+                    async with semaphore:
+                        user = await self.get_user(raw_subscription["username"])
+                    if isinstance(user, dict):
+                        user = create_user(raw_subscription, self)
+                        user.active = False
             subscription_model = SubscriptionModel(raw_subscription, user, self)
             return subscription_model
 
-        subscriptions: list[SubscriptionModel] = []
         if identifiers:
-            found_raw_subscriptions: list[dict[str, Any]] = []
-            for identifier in identifiers:
-                for raw_subscription in raw_subscriptions:
-                    if (
-                        identifier == raw_subscription["id"]
-                        or identifier == raw_subscription["username"]
-                    ):
-                        found_raw_subscriptions.append(raw_subscription)
-                        break
-            raw_subscriptions = found_raw_subscriptions
-        with self.get_pool() as pool:
-            tasks = pool.starmap(assign_user_to_sub, product(raw_subscriptions))
-            subscriptions: list[SubscriptionModel] = await asyncio.gather(*tasks)
+            found_raw_subscriptions: dict[int | str, dict[str, Any]] = {}
+            for raw_subscription in raw_subscriptions:
+                found_raw_subscriptions.setdefault(
+                    raw_subscription["id"], raw_subscription
+                )
+                found_raw_subscriptions.setdefault(
+                    raw_subscription["username"], raw_subscription
+                )
+            raw_subscriptions = [
+                found_raw_subscriptions[identifier]
+                for identifier in identifiers
+                if identifier in found_raw_subscriptions
+            ]
+        subscriptions: list[SubscriptionModel] = await asyncio.gather(
+            *[assign_user_to_sub(x) for x in raw_subscriptions]
+        )
         return subscriptions
 
     async def get_chats(
@@ -362,7 +413,9 @@ class create_auth(create_user):
         depth: int = 1,
         refresh: bool = True,
     ) -> list[dict[str, Any]]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_chats"
+        )
         if status:
             return result
 
@@ -408,7 +461,9 @@ class create_auth(create_user):
         limit: int = 10,
         offset: int = 0,
     ) -> list[dict[str, Any]]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_mass_messages"
+        )
         if status:
             return result
         link = endpoint_links(
@@ -446,34 +501,115 @@ class create_auth(create_user):
         limit: int = 10,
         offset: int = 0,
         inside_loop: bool = False,
+        incremental: bool = False,
     ) -> list[create_message | create_post] | ErrorDetails:
-        result, status = await api_helper.default_data(self, refresh)
+        """
+        If check is True, only the first page is fetched.
+        If incremental is True, pagination stops at the first item seen by the last complete crawl (kept by the watermark manager)
+        and new items are added in front of paid_content.
+
+        inside_loop is deprecated, pages come from iter_paid_content.
+        """
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_paid_content"
+        )
         if status:
             return result
-        link = endpoint_links(global_limit=limit, global_offset=offset).paid_api
-        final_results = await self.session_manager.json_request(link)
-        if not isinstance(final_results, ErrorDetails):
-            if len(final_results) > 0 and not check:
-                results2 = await self.get_paid_content(
-                    limit=limit, offset=limit + offset, inside_loop=True
+        if inside_loop:
+            warnings.warn(
+                "get_paid_content's inside_loop is deprecated and will be removed",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        if check:
+            link = endpoint_links(global_limit=limit, global_offset=offset).paid_api
+            results = await self.session_manager.json_request(link)
+            if isinstance(results, ErrorDetails):
+                return results
+            items, _has_more = self.scrape_manager.extract_page(results)
+            self.paid_content = await self.finalize_paid_content(items)
+            return self.paid_content
+        watermark_manager = self.get_api().watermark_manager
+        # Purchases aren't ordered by id, the newest few keys are kept in case one of them is removed
+        newest_keys: list[list[Any]] = (
+            watermark_manager.get(self.id, "PaidContent", self.id) or []
+        )
+        known_keys: Optional[set[tuple[str, int]]] = None
+        if incremental:
+            known_keys = {(x.responseType, x.id) for x in self.paid_content}
+            known_keys.update((x[0], x[1]) for x in newest_keys)
+        # iter_paid_content raises if a page fails, so the boundary only moves after a complete crawl
+        final_results = [
+            content
+            async for content in self.iter_paid_content(
+                limit, offset, known_keys=known_keys
+            )
+        ]
+        if incremental:
+            if final_results:
+                newest_keys = [
+                    [x.responseType, x.id] for x in final_results[:limit]
+                ] + newest_keys
+                watermark_manager.set(
+                    self.id, "PaidContent", newest_keys[:limit], self.id
                 )
-                final_results.extend(results2)
-            if not inside_loop:
-                temp: list[create_message | create_post] = []
-                for final_result in final_results:
-                    content = None
-                    if final_result["responseType"] == "message":
-                        user = await self.get_user(final_result["fromUser"]["id"])
-                        if not user:
-                            user = create_user(final_result["fromUser"], self)
-                        content = create_message(final_result, user)
-                    elif final_result["responseType"] == "post":
-                        user = create_user(final_result["author"], self)
-                        content = create_post(final_result, user)
-                    if content:
-                        temp.append(content)
-                final_results = temp
-            self.paid_content = final_results
+                watermark_manager.save()
+            final_results.extend(self.paid_content)
+        self.paid_content = final_results
+        return final_results
+
+    async def iter_paid_content(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        lookahead: Optional[int] = None,
+        known_keys: Optional[set[tuple[str, int]]] = None,
+    ) -> AsyncGenerator[create_message | create_post, None]:
+        """
+        Yields paid posts and messages page by page, newest purchase first.
+        Up to lookahead pages are fetched while a page's authors are being resolved.
+        Content isn't added to paid_content.
+
+        If known_keys ((responseType, id)) is given, pagination stops at the first known item.
+        """
+        link = endpoint_links(global_limit=limit, global_offset=offset).paid_api
+        seen_keys: set[tuple[str, int]] = set()
+        async with aclosing(
+            self.scrape_manager.iter_pages(link, limit, offset, lookahead)
+        ) as pages:
+            async for page in pages:
+                items: list[dict[str, Any]] = []
+                for item in page:
+                    key = (item["responseType"], item["id"])
+                    if known_keys is not None and key in known_keys:
+                        for content in await self.finalize_paid_content(items):
+                            yield content
+                        return
+                    # Offsets shift when something is bought mid crawl
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        items.append(item)
+                for content in await self.finalize_paid_content(items):
+                    yield content
+
+    async def finalize_paid_content(self, items: list[dict[str, Any]]):
+        """Turns paid items into content, message authors are looked up together"""
+        authors = await self.get_users(
+            [x["fromUser"]["id"] for x in items if x["responseType"] == "message"]
+        )
+        final_results: list[create_message | create_post] = []
+        for item in items:
+            match item["responseType"]:
+                case "message":
+                    user = authors.get(item["fromUser"]["id"]) or create_user(
+                        item["fromUser"], self
+                    )
+                    final_results.append(create_message(item, user))
+                case "post":
+                    user = create_user(item["author"], self)
+                    final_results.append(create_post(item, user))
+                case _:
+                    pass
         return final_results
 
     async def resolve_user(self, post_id: int | None = None):
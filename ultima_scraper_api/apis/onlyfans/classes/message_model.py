@@ -4,42 +4,43 @@ from typing import TYPE_CHECKING, Any, Optional
 
 from ultima_scraper_api.apis.onlyfans import SiteContent
 from ultima_scraper_api.apis.onlyfans.classes.extras import endpoint_links
+from ultima_scraper_api.models.content_model import RawField
 
 if TYPE_CHECKING:
     from ultima_scraper_api.apis.onlyfans.classes.user_model import create_user
 
 
 class create_message(SiteContent):
-    def __init__(self, option: dict[str, Any], user: create_user) -> None:
+    __slots__ = ("user",)
+
+    responseType = RawField[Optional[str]]("responseType")
+    text = RawField[str]("text", "")
+    lockedText = RawField[Optional[bool]]("lockedText")
+    isFree = RawField[Optional[bool]]("isFree")
+    price = RawField[Optional[float]]("price")
+    isMediaReady = RawField[Optional[bool]]("isMediaReady")
+    mediaCount = RawField[Optional[int]]("mediaCount")
+    previews = RawField[list[dict[str, Any]]]("previews", default_factory=list)
+    isTip = RawField[Optional[bool]]("isTip")
+    isReportedByMe = RawField[Optional[bool]]("isReportedByMe")
+    isFromQueue = RawField[Optional[bool]]("isFromQueue")
+    queueId = RawField[Optional[int]]("queueId")
+    canUnsendQueue = RawField[Optional[bool]]("canUnsendQueue")
+    unsendSecondsQueue = RawField[Optional[int]]("unsendSecondsQueue")
+    isOpened = RawField[Optional[bool]]("isOpened")
+    isNew = RawField[Optional[bool]]("isNew")
+    createdAt = RawField[Optional[str]]("createdAt")
+    changedAt = RawField[Optional[str]]("changedAt")
+    cancelSeconds = RawField[Optional[int]]("cancelSeconds")
+    isLiked = RawField[Optional[bool]]("isLiked")
+    canPurchase = RawField[Optional[bool]]("canPurchase")
+    canPurchaseReason = RawField[Optional[str]]("canPurchaseReason")
+    canReport = RawField[Optional[bool]]("canReport")
 
+    def __init__(self, option: dict[str, Any], user: create_user) -> None:
         author = user.get_authed().find_user_by_identifier(option["fromUser"]["id"])
         self.user = user
         SiteContent.__init__(self, option, author)
-        self.responseType: Optional[str] = option.get("responseType")
-        self.text: str = option.get("text", "")
-        self.lockedText: Optional[bool] = option.get("lockedText")
-        self.isFree: Optional[bool] = option.get("isFree")
-        self.price: Optional[float] = option.get("price")
-        self.isMediaReady: Optional[bool] = option.get("isMediaReady")
-        self.mediaCount: Optional[int] = option.get("mediaCount")
-        self.media: list[dict[str, Any]] = option.get("media", [])
-        self.previews: list[dict[str, Any]] = option.get("previews", [])
-        self.isTip: Optional[bool] = option.get("isTip")
-        self.isReportedByMe: Optional[bool] = option.get("isReportedByMe")
-        self.isFromQueue: Optional[bool] = option.get("isFromQueue")
-        self.queueId: Optional[int] = option.get("queueId")
-        self.canUnsendQueue: Optional[bool] = option.get("canUnsendQueue")
-        self.unsendSecondsQueue: Optional[int] = option.get("unsendSecondsQueue")
-        self.isOpened: Optional[bool] = option.get("isOpened")
-        self.isNew: Optional[bool] = option.get("isNew")
-        self.createdAt: Optional[str] = option.get("createdAt")
-        self.changedAt: Optional[str] = option.get("changedAt")
-        self.cancelSeconds: Optional[int] = option.get("cancelSeconds")
-        self.isLiked: Optional[bool] = option.get("isLiked")
-        self.canPurchase: Optional[bool] = option.get("canPurchase")
-        self.canPurchaseReason: Optional[str] = option.get("canPurchaseReason")
-        self.canReport: Optional[bool] = option.get("canReport")
-        self.__raw__ = option
 
     def get_author(self):
         return self.author
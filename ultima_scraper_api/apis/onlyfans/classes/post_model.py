@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Any
 
 from ultima_scraper_api.apis.onlyfans import SiteContent
 from ultima_scraper_api.apis.onlyfans.classes.extras import endpoint_links
+from ultima_scraper_api.models.content_model import RawField
 
 if TYPE_CHECKING:
     from ultima_scraper_api.apis.onlyfans.classes.user_model import (
@@ -12,47 +13,51 @@ if TYPE_CHECKING:
     )
 
 
+def to_text(value: Any):
+    return str(value or "")
+
+
 class create_post(SiteContent):
+    __slots__ = ("comments",)
+
+    responseType = RawField[str]("responseType")
+    createdAt = RawField[str]("postedAt")
+    postedAtPrecise = RawField[str]("postedAtPrecise")
+    expiredAt = RawField[Any]("expiredAt")
+    text = RawField("text", convert=to_text)
+    rawText = RawField("rawText", convert=to_text)
+    lockedText = RawField[bool]("lockedText")
+    isFavorite = RawField[bool]("isFavorite")
+    isReportedByMe = RawField[bool]("isReportedByMe")
+    canReport = RawField[bool]("canReport")
+    canDelete = RawField[bool]("canDelete")
+    canComment = RawField[bool]("canComment")
+    canEdit = RawField[bool]("canEdit")
+    isPinned = RawField[bool]("isPinned")
+    favoritesCount = RawField[int]("favoritesCount")
+    mediaCount = RawField[int]("mediaCount", 0)
+    isMediaReady = RawField[bool]("isMediaReady")
+    voting = RawField[list[Any]]("voting")
+    isOpened = RawField[bool]("isOpened")
+    canToggleFavorite = RawField[bool]("canToggleFavorite")
+    streamId = RawField[Any]("streamId")
+    price = RawField[Any]("price")
+    hasVoting = RawField[bool]("hasVoting")
+    isAddedToBookmarks = RawField[bool]("isAddedToBookmarks")
+    isArchived = RawField[bool]("isArchived")
+    isDeleted = RawField[bool]("isDeleted")
+    hasUrl = RawField[bool]("hasUrl")
+    commentsCount = RawField[int]("commentsCount")
+    mentionedUsers = RawField[list[Any]]("mentionedUsers")
+    linkedUsers = RawField[list[Any]]("linkedUsers")
+    linkedPosts = RawField[list[Any]]("linkedPosts")
+    canViewMedia = RawField[bool]("canViewMedia")
+    preview = RawField[list[int]]("preview", default_factory=list)
+    canPurchase = RawField[bool]("canPurchase")
+
     def __init__(self, option: dict[str, Any], user: create_auth | create_user) -> None:
         SiteContent.__init__(self, option, user)
-        self.responseType: str = option.get("responseType")
-        self.createdAt: str = option.get("postedAt")
-        self.postedAtPrecise: str = option.get("postedAtPrecise")
-        self.expiredAt: Any = option.get("expiredAt")
-        text: str = option.get("text", "")
-        self.text = str(text or "")
-        raw_text: str = option.get("rawText", "")
-        self.rawText = str(raw_text or "")
-        self.lockedText: bool = option.get("lockedText")
-        self.isFavorite: bool = option.get("isFavorite")
-        self.isReportedByMe: bool = option.get("isReportedByMe")
-        self.canReport: bool = option.get("canReport")
-        self.canDelete: bool = option.get("canDelete")
-        self.canComment: bool = option.get("canComment")
-        self.canEdit: bool = option.get("canEdit")
-        self.isPinned: bool = option.get("isPinned")
-        self.favoritesCount: int = option.get("favoritesCount")
-        self.mediaCount: int = option.get("mediaCount", 0)
-        self.isMediaReady: bool = option.get("isMediaReady")
-        self.voting: list = option.get("voting")
-        self.isOpened: bool = option.get("isOpened")
-        self.canToggleFavorite: bool = option.get("canToggleFavorite")
-        self.streamId: Any = option.get("streamId")
-        self.price: Any = option.get("price")
-        self.hasVoting: bool = option.get("hasVoting")
-        self.isAddedToBookmarks: bool = option.get("isAddedToBookmarks")
-        self.isArchived: bool = option.get("isArchived")
-        self.isDeleted: bool = option.get("isDeleted")
-        self.hasUrl: bool = option.get("hasUrl")
-        self.commentsCount: int = option.get("commentsCount")
-        self.mentionedUsers: list = option.get("mentionedUsers")
-        self.linkedUsers: list = option.get("linkedUsers")
-        self.linkedPosts: list = option.get("linkedPosts")
-        self.canViewMedia: bool = option.get("canViewMedia")
-        self.preview: list[int] = option.get("preview", [])
-        self.canPurchase: bool = option.get("canPurchase")
         self.comments: list[Any] = []
-        self.__raw__ = option
 
     def get_author(self):
         return self.author
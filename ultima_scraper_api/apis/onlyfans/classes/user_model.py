@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import math
-from itertools import chain
-from typing import TYPE_CHECKING, Any, Optional, Union
+import warnings
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Optional, Union
 from urllib import parse
 
 import ultima_scraper_api.apis.onlyfans.classes.message_model as message_model
@@ -17,6 +18,12 @@ from ultima_scraper_api.managers.scrape_manager import ScrapeManager
 if TYPE_CHECKING:
     from ultima_scraper_api.apis.onlyfans.classes.auth_model import create_auth
     from ultima_scraper_api.apis.onlyfans.classes.post_model import create_post
+    from ultima_scraper_api.managers.job_manager.jobs.custom_job import CustomJob
+
+
+def get_post_order_key(post: dict[str, Any]):
+    # Pinned posts are listed first regardless of their age
+    return None if post.get("isPinned") else float(post["postedAtPrecise"])
 
 
 class create_user(StreamlinedUser):
@@ -239,9 +246,15 @@ class create_user(StreamlinedUser):
         return status
 
     async def get_stories(
-        self, refresh: bool = True, limit: int = 100, offset: int = 0
+        self,
+        refresh: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+        incremental: bool = False,
     ) -> list[create_story]:
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_stories"
+        )
         if status:
             return result
         links = [
@@ -250,7 +263,21 @@ class create_user(StreamlinedUser):
             ).stories_api
         ]
 
-        results = await self.scrape_manager.bulk_scrape(links)
+        if incremental:
+            # A failed request raises, the watermark mustn't move past stories that weren't seen
+            results = await self.scrape_manager.fetch_page(links[0])
+            watermark_manager = self.get_api().watermark_manager
+            auth_id = self.get_authed().id
+            since = watermark_manager.get(self.id, "Stories", auth_id)
+            if since is not None:
+                results = [x for x in results if x["id"] > since]
+            if results:
+                watermark_manager.update(
+                    self.id, "Stories", max(x["id"] for x in results), auth_id
+                )
+                watermark_manager.save()
+        else:
+            results = await self.scrape_manager.bulk_scrape(links)
         final_results = [create_story(x, self) for x in results]
         self.scrape_manager.scraped.Stories = final_results
         return final_results
@@ -265,7 +292,9 @@ class create_user(StreamlinedUser):
     ) -> list[create_highlight] | list[create_story]:
         from ultima_scraper_api import error_types
 
-        default_result, status = await api_helper.default_data(self, refresh)
+        default_result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_highlights"
+        )
         if status:
             return default_result
         final_results = []
@@ -292,10 +321,30 @@ class create_user(StreamlinedUser):
         limit: int = 50,
         offset: int = 0,
         refresh: bool = True,
+        incremental: bool = False,
     ) -> list[create_post]:
-        result, status = await api_helper.default_data(self, refresh)
+        """
+        If incremental is True, only posts newer than the last incremental scrape are fetched and returned.
+        """
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_posts"
+        )
         if status:
             return result
+        if incremental and not links:
+            watermark_manager = self.get_api().watermark_manager
+            auth_id = self.get_authed().id
+            since = watermark_manager.get(self.id, "Posts", auth_id)
+            # iter_posts raises if a page fails, so this only runs once the crawl reached since or the end
+            final_results = [
+                post async for post in self.iter_posts(limit, offset, since=since)
+            ]
+            if final_results:
+                newest = max(float(x.postedAtPrecise) for x in final_results)
+                watermark_manager.update(self.id, "Posts", newest, auth_id)
+                watermark_manager.save()
+            self.scrape_manager.scraped.Posts = final_results
+            return final_results
         if links is None:
             links = []
         if not links:
@@ -307,6 +356,39 @@ class create_user(StreamlinedUser):
         self.scrape_manager.scraped.Posts = final_results
         return final_results
 
+    async def iter_posts(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        lookahead: Optional[int] = None,
+        since: Optional[float] = None,
+        job: Optional[CustomJob] = None,
+    ) -> AsyncGenerator[create_post, None]:
+        """
+        Yields posts page by page instead of holding every page in memory like get_posts.
+        Posts aren't added to scrape_manager.scraped.
+
+        If since (postedAtPrecise) is given, pagination stops at the first unpinned post that isn't newer.
+        If job is given, its progress is recorded and a restored job continues from its checkpoint.
+        Pagination only stops at hasMore=false (postsCount can be stale or hidden), a page that fails raises ScrapeError.
+        """
+        link = endpoint_links().list_posts(
+            self.id, global_limit=limit, global_offset=offset
+        )
+        async with aclosing(
+            self.scrape_manager.iter_pages(
+                link, limit, offset, lookahead, job, order_key=get_post_order_key
+            )
+        ) as pages:
+            async for page in pages:
+                for post in self.finalize_content_set(page):
+                    if since is not None and float(post.postedAtPrecise) <= since:
+                        # Pinned posts are listed first regardless of their age
+                        if post.isPinned:
+                            continue
+                        return
+                    yield post
+
     async def get_post(
         self, identifier: Optional[int | str] = None, limit: int = 10, offset: int = 0
     ) -> Union[create_post, ErrorDetails]:
@@ -327,54 +409,102 @@ class create_user(StreamlinedUser):
 
     async def get_messages(
         self,
-        links: list[str] = [],
+        links: Optional[list[str]] = None,
         limit: int = 10,
         offset: int = 0,
         depth: int = 1,
         refresh: bool = True,
+        *,
+        incremental: bool = False,
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        """
+        links and depth are deprecated, pages come from iter_messages.
+        Messages from links are still added if they aren't in the chat pages.
+        """
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_messages"
+        )
         if status:
             return result
-        multiplier = self.get_session_manager().max_threads
-        temp_limit = limit
-        temp_offset = offset
+        if links or depth != 1:
+            warnings.warn(
+                "get_messages' links and depth are deprecated and will be removed",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        if incremental:
+            final_results = await self.get_new_messages(limit)
+        else:
+            final_results = [x async for x in self.iter_messages(limit, offset)]
+        if links:
+            seen = {x.id for x in final_results}
+            for link in links:
+                page = await self.scrape_manager.scrape(link)
+                raw_messages, _has_more = self.scrape_manager.extract_page(page)
+                for raw_message in raw_messages:
+                    if raw_message["id"] not in seen:
+                        seen.add(raw_message["id"])
+                        final_results.append(
+                            message_model.create_message(raw_message, self)
+                        )
+        self.scrape_manager.scraped.Messages = final_results
+        return final_results
+
+    async def iter_messages(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        lookahead: int | None = None,
+        job: Optional[CustomJob] = None,
+        since: Optional[int] = None,
+    ) -> AsyncGenerator[message_model.create_message, None]:
+        """Streams the chat newest first, fetching up to `lookahead` pages ahead.
+
+        Messages are deduplicated by id, pages shift when new messages arrive mid scrape.
+        A page that fails raises ScrapeError.
+        If since (a message id) is given, pagination stops at the first message that isn't newer.
+        """
         link = endpoint_links(
-            identifier=self.id, global_limit=temp_limit, global_offset=temp_offset
+            identifier=self.id, global_limit=limit, global_offset=offset
         ).message_api
-        unpredictable_links, new_offset = api_helper.calculate_the_unpredictable(
-            link, offset, limit, multiplier, depth
-        )
-        links = unpredictable_links if depth != 1 else links + unpredictable_links
-        results = await self.get_session_manager().bulk_json_requests(links)
-        results = await api_helper.remove_errors(results)
-        final_results = []
-        if isinstance(results, list):
-            results = [x for x in results if x]
-            has_more = results[-1]["hasMore"] if results else False
-            final_results = [x["list"] for x in results if "list" in x]
-            final_results = list(chain.from_iterable(final_results))
-
-            if has_more:
-                results2 = await self.get_messages(
-                    limit=temp_limit,
-                    offset=new_offset,
-                    depth=depth + 1,
-                )
-                final_results.extend(results2)
-            if depth == 1:
-                if len(final_results) > 1:
-                    last_link = f"{link}&id={final_results[-1]['id']}"
-                    first_message = await self.get_session_manager().json_request(
-                        last_link
-                    )
-                    final_results.extend(first_message["list"])
-                final_results = [
-                    message_model.create_message(x, self) for x in final_results if x
-                ]
-            else:
-                final_results.sort(key=lambda x: x["fromUser"]["id"], reverse=True)
-            self.scrape_manager.scraped.Messages = final_results
+        seen: set[int] = set()
+        last_id = None
+        async with aclosing(
+            self.scrape_manager.iter_pages(link, limit, offset, lookahead, job)
+        ) as pages:
+            async for page in pages:
+                for raw_message in page:
+                    if since is not None and raw_message["id"] <= since:
+                        # The rest of the chat, first message included, was already seen
+                        return
+                    if raw_message["id"] in seen:
+                        continue
+                    seen.add(raw_message["id"])
+                    last_id = raw_message["id"]
+                    yield message_model.create_message(raw_message, self)
+        if len(seen) > 1:
+            # Offset pages can miss the first message of the chat, ask for it by id
+            first_message = await self.scrape_manager.fetch_page(f"{link}&id={last_id}")
+            raw_messages, _has_more = self.scrape_manager.extract_page(first_message)
+            for raw_message in raw_messages:
+                if raw_message["id"] not in seen:
+                    seen.add(raw_message["id"])
+                    yield message_model.create_message(raw_message, self)
+
+    async def get_new_messages(self, limit: int = 10):
+        """
+        Returns messages newer than the last incremental scrape, pagination stops at the first known message.
+        """
+        watermark_manager = self.get_api().watermark_manager
+        # Chats belong to the auth, another auth's watermark says nothing about this one
+        auth_id = self.get_authed().id
+        since: Optional[int] = watermark_manager.get(self.id, "Messages", auth_id)
+        final_results = [x async for x in self.iter_messages(limit, since=since)]
+        if final_results:
+            newest = max(x.id for x in final_results)
+            watermark_manager.update(self.id, "Messages", newest, auth_id)
+            watermark_manager.save()
+        self.scrape_manager.scraped.Messages = final_results
         return final_results
 
     async def get_message_by_id(
@@ -407,7 +537,9 @@ class create_user(StreamlinedUser):
     async def get_archived_stories(
         self, refresh: bool = True, limit: int = 100, offset: int = 0
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_archived_stories"
+        )
         if status:
             return result
         link = endpoint_links(global_limit=limit, global_offset=offset).archived_stories
@@ -423,7 +555,9 @@ class create_user(StreamlinedUser):
         limit: int = 10,
         offset: int = 0,
     ):
-        result, status = await api_helper.default_data(self, refresh)
+        result, status = await api_helper.default_data(
+            self, refresh, function_that_called="get_archived_posts"
+        )
         if status:
             return result
         if links is None:
@@ -5,6 +5,7 @@ from ultima_scraper_api.apis.onlyfans.classes.auth_model import create_auth
 from ultima_scraper_api.apis.onlyfans.classes.extras import AuthDetails, endpoint_links
 from ultima_scraper_api.apis.onlyfans.classes.user_model import create_user
 from ultima_scraper_api.classes.make_settings import Config
+from ultima_scraper_api.managers.user_registry import UserRegistry
 
 
 class OnlyFansAPI(StreamlinedAPI):
@@ -12,11 +13,11 @@ class OnlyFansAPI(StreamlinedAPI):
         self.site_name: Literal["OnlyFans"] = "OnlyFans"
         StreamlinedAPI.__init__(self, self, config)
         self.auths: list[create_auth] = []
-        self.users: dict[int, create_user] = {}
+        self.users: UserRegistry[create_user] = UserRegistry()
         self.endpoint_links = endpoint_links
 
     def add_user(self, user: create_auth):
-        self.users[user.id] = user
+        self.users.add(user)
 
     def get_auth(self, identifier: Union[str, int]) -> Optional[create_auth]:
         final_auth = None
@@ -179,6 +179,10 @@ class Settings(object):
         cert: str = "",
         random_string: str = "",
         tui: dict[str, bool] = {},
+        network: dict[str, Any] = {},
+        jobs: dict[str, Any] = {},
+        bandwidth: dict[str, Any] = {},
+        data_directory: str = "__user_data__",
     ):
         class webhooks_settings:
             def __init__(self, option: dict[str, Any] = {}) -> None:
@@ -235,6 +239,46 @@ class Settings(object):
                 self.port = option.get("port", 2112)
                 self.api_key = option.get("api_key", uuid.uuid1().hex)
 
+        class network_settings:
+            def __init__(self, option: dict[str, Any] = {}) -> None:
+                # 0 = unlimited
+                self.max_connections: int = option.get("max_connections", 0)
+                self.max_connections_per_host: int = option.get(
+                    "max_connections_per_host", 0
+                )
+                self.keepalive_timeout: float = option.get("keepalive_timeout", 30)
+                # None disables the DNS cache
+                self.dns_cache_ttl: int | None = option.get("dns_cache_ttl", 300)
+                # Auths that use the same proxy will reuse the same connections
+                self.share_connections: bool = option.get("share_connections", True)
+                # Seconds between background proxy health checks, 0 disables them
+                self.proxy_check_interval: float = option.get(
+                    "proxy_check_interval", 300
+                )
+                # Seconds a failing proxy is left out, doubles each time it fails again
+                self.proxy_quarantine_time: float = option.get(
+                    "proxy_quarantine_time", 60
+                )
+
+        class jobs_settings:
+            def __init__(self, option: dict[str, Any] = {}) -> None:
+                self.max_workers: int = option.get("max_workers", 4)
+                # A slow auth can only hold this many workers, 0 = unlimited
+                self.max_jobs_per_auth: int = option.get("max_jobs_per_auth", 2)
+
+        class bandwidth_settings:
+            def __init__(self, option: dict[str, Any] = {}) -> None:
+                # Bytes per second, 0 = unlimited
+                self.max_bytes_per_second: int = option.get("max_bytes_per_second", 0)
+                self.max_bytes_per_second_per_host: int = option.get(
+                    "max_bytes_per_second_per_host", 0
+                )
+                self.max_connections_per_host: int = option.get(
+                    "max_connections_per_host", 0
+                )
+                # {auth_id: weight}, auths get a share of max_bytes_per_second relative to their weight (default 1)
+                self.auth_weights: dict[str, float] = option.get("auth_weights", {})
+
         self.auto_site_choice = auto_site_choice
         self.export_type = export_type
         self.max_threads = max_threads
@@ -250,6 +294,11 @@ class Settings(object):
         self.cert = cert
         self.random_string = random_string if random_string else uuid.uuid1().hex
         self.tui = tui_settings(tui)
+        self.network = network_settings(network)
+        self.jobs = jobs_settings(jobs)
+        self.bandwidth = bandwidth_settings(bandwidth)
+        # Runtime state (watermarks, caches), not downloads or metadata
+        self.data_directory = data_directory
 
 
 class Config(object):
@@ -92,7 +92,17 @@ class create_metadata(object):
             print
         return new_format
 
+    @staticmethod
+    def create_link_keys(post_id: int, media: format_content.media_item):
+        # Legacy media may not have a media_id, those are matched by their link instead
+        return [
+            (post_id, link.split("?")[0])
+            for link in media.links
+            if isinstance(link, str) and link
+        ]
+
     def compare_metadata(self, old_metadata: create_metadata) -> create_metadata:
+        skipped_keys = ["directory", "downloaded", "size", "filename"]
         for key, value in old_metadata.content:
             new_value = getattr(self.content, key, None)
             if not new_value:
@@ -100,73 +110,74 @@ class create_metadata(object):
             if not value:
                 setattr(old_metadata, key, new_value)
             for key2, value2 in value:
-                new_value2 = getattr(new_value, key2)
-                seen = set()
-                old_status = []
+                new_status = getattr(new_value, key2)
+                old_status: list[format_content.post_item] = []
+                seen: set[int] = set()
                 for d in value2:
                     if d.post_id not in seen:
                         seen.add(d.post_id)
                         old_status.append(d)
-                    else:
-                        print
                 setattr(value, key2, old_status)
-                value2 = old_status
-                new_status = new_value2
-                for post in old_status:
-                    if key != "Texts":
+                if key != "Texts":
+                    # (post_id, media_id): the first new media, same as the first match of a scan
+                    new_medias: dict[tuple[int, Any], Any] = {}
+                    new_links: dict[tuple[int, str], Any] | None = None
+                    for new_post in new_status:
+                        for new_media in new_post.medias:
+                            new_medias.setdefault(
+                                (new_post.post_id, new_media.media_id), new_media
+                            )
+                    for post in old_status:
                         for old_media in post.medias:
                             new_found = None
-                            new_items = [
-                                x for x in new_status if post.post_id == x.post_id
-                            ]
-                            if new_items:
-                                for new_item in (x for x in new_items if not new_found):
-                                    for new_media in (
-                                        x for x in new_item.medias if not new_found
-                                    ):
-                                        new_found = test(new_media, old_media)
-                                        print
+                            if old_media.media_id is not None:
+                                new_found = new_medias.get(
+                                    (post.post_id, old_media.media_id)
+                                )
+                            else:
+                                if new_links is None:
+                                    new_links = {}
+                                    for new_post in new_status:
+                                        for new_media in new_post.medias:
+                                            for link_key in self.create_link_keys(
+                                                new_post.post_id, new_media
+                                            ):
+                                                new_links.setdefault(
+                                                    link_key, new_media
+                                                )
+                                for link_key in self.create_link_keys(
+                                    post.post_id, old_media
+                                ):
+                                    new_found = new_links.get(link_key)
+                                    if new_found:
+                                        break
                             if new_found:
                                 for key3, v in new_found:
-                                    if key3 in [
-                                        "directory",
-                                        "downloaded",
-                                        "size",
-                                        "filename",
-                                    ]:
+                                    if key3 in skipped_keys:
                                         continue
                                     setattr(old_media, key3, v)
                                 setattr(new_found, "found", True)
-                    else:
-                        new_items = [x for x in new_status if post.post_id == x.post_id]
-                        if new_items:
-                            new_found = new_items[0]
+                else:
+                    new_posts: dict[int, Any] = {}
+                    for new_post in new_status:
+                        new_posts.setdefault(new_post.post_id, new_post)
+                    for post in old_status:
+                        new_found = new_posts.get(post.post_id)
+                        if new_found:
                             for key3, v in new_found:
-                                if key3 in [
-                                    "directory",
-                                    "downloaded",
-                                    "size",
-                                    "filename",
-                                ]:
+                                if key3 in skipped_keys:
                                     continue
                                 setattr(post, key3, v)
                             setattr(new_found, "found", True)
-                        print
                 for new_post in new_status:
-                    not_found = []
                     if key != "Texts":
-                        not_found = [
-                            new_post
+                        if any(
+                            not getattr(media, "found", None)
                             for media in new_post.medias
-                            if not getattr(media, "found", None)
-                        ][:1]
-                    else:
-                        found = getattr(new_post, "found", None)
-                        if not found:
-                            not_found.append(new_post)
-
-                    if not_found:
-                        old_status += not_found
+                        ):
+                            old_status.append(new_post)
+                    elif not getattr(new_post, "found", None):
+                        old_status.append(new_post)
                 old_status.sort(key=lambda x: x.post_id, reverse=True)
         new_metadata = old_metadata
         return new_metadata
@@ -319,6 +330,8 @@ class format_attributes(object):
 async def legacy_metadata_fixer(
     new_metadata_filepath: Path, legacy_metadata_filepaths: list[Path]
 ) -> tuple[create_metadata, list[Path]]:
+    if new_metadata_filepath.suffix == ".db":
+        return migrate_metadata(new_metadata_filepath, legacy_metadata_filepaths)
     delete_legacy_metadatas: list[Path] = []
     new_format: list[dict[str, Any]] = []
     new_metadata_set = main_helper.import_json(new_metadata_filepath)
@@ -341,3 +354,41 @@ async def legacy_metadata_fixer(
     old_metadata_object = create_metadata(old_metadata_set)
     results = new_metadata_object.compare_metadata(old_metadata_object)
     return results, delete_legacy_metadatas
+
+
+def migrate_metadata(
+    metadata_filepath: Path, legacy_metadata_filepaths: list[Path]
+) -> tuple[create_metadata, list[Path]]:
+    """Imports legacy .json metadata into the MetadataStore at metadata_filepath and loads everything it holds
+
+    Returns:
+        tuple[create_metadata, list[Path]]: The metadata and the legacy files that can be deleted
+    """
+    from ultima_scraper_api.managers.metadata_manager import MetadataStore
+
+    with MetadataStore(metadata_filepath) as metadata_store:
+        delete_legacy_metadatas = metadata_store.migrate(
+            [x for x in legacy_metadata_filepaths if x.suffix == ".json"]
+        )
+        metadata_sets = [
+            metadata_store.export(api_type)
+            for api_type in metadata_store.get_api_types()
+        ]
+    metadata_set = dict(api_helper.merge_dictionaries(metadata_sets))
+    return create_metadata(metadata_set), delete_legacy_metadatas
+
+
+def export_metadata(
+    metadata: create_metadata, metadata_filepath: Path, api_type: str = ""
+):
+    """Saves a creator's metadata after a scrape
+
+    A .db file only has the given posts upserted (api_type defaults to the filename), anything else is rewritten as json.
+    """
+    if metadata_filepath.suffix == ".db":
+        from ultima_scraper_api.managers.metadata_manager import MetadataStore
+
+        with MetadataStore(metadata_filepath) as metadata_store:
+            metadata_store.upsert_metadata(api_type or metadata_filepath.stem, metadata)
+    else:
+        main_helper.export_json(metadata.convert(), metadata_filepath)
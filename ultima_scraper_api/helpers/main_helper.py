@@ -178,7 +178,10 @@ def export_json(metadata: list[Any] | dict[str, Any], filepath: Path):
 
 
 def object_to_json(item: Any):
-    _json = orjson.loads(orjson.dumps(item, default=lambda o: o.__dict__))
+    def default(o: Any):
+        return o.to_dict() if hasattr(o, "to_dict") else o.__dict__
+
+    _json = orjson.loads(orjson.dumps(item, default=default))
     return _json
 
 
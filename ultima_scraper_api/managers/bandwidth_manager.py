@@ -0,0 +1,180 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import urlparse
+
+from ultima_scraper_api.managers.session_manager import TokenBucket
+
+
+class ThroughputMeter:
+    def __init__(self, window: float = 10) -> None:
+        self.window = window
+        self.total_bytes = 0
+        self.samples: deque[tuple[float, int]] = deque()
+
+    def add(self, amount: int):
+        now = time.monotonic()
+        self.total_bytes += amount
+        self.samples.append((now, amount))
+        self.expire(now)
+
+    def expire(self, now: float):
+        while self.samples and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+    def get_rate(self):
+        """
+        Returns:
+            float: Bytes per second over the last window
+        """
+        self.expire(time.monotonic())
+        return sum(x[1] for x in self.samples) / self.window
+
+
+class BandwidthGovernor:
+    """Shares download bandwidth and connections between every auth
+
+    Global bytes are handed out by weighted fair queueing, an owner (usually an auth's id) with weight 2 gets twice the share of one with weight 1 while both are downloading.
+    """
+
+    def __init__(
+        self,
+        max_bytes_per_second: float = 0,
+        max_bytes_per_second_per_host: float = 0,
+        max_connections_per_host: int = 0,
+        weights: dict[Any, float] = {},
+    ) -> None:
+        """
+        Args:
+            max_bytes_per_second (float, optional): Global cap, 0 = unlimited. Defaults to 0.
+            max_bytes_per_second_per_host (float, optional): Cap for each host, 0 = unlimited. Defaults to 0.
+            max_connections_per_host (int, optional): Concurrent downloads per host, 0 = unlimited. Defaults to 0.
+            weights (dict[Any, float], optional): Owner (auth id): weight, owners that aren't listed have a weight of 1.
+        """
+        self.max_bytes_per_second = max_bytes_per_second
+        self.max_bytes_per_second_per_host = max_bytes_per_second_per_host
+        self.max_connections_per_host = max_connections_per_host
+        self.weights = {str(k): v for k, v in weights.items()}
+        self.global_bucket = (
+            TokenBucket(max_bytes_per_second, max_bytes_per_second)
+            if max_bytes_per_second
+            else None
+        )
+        self.host_buckets: dict[str, TokenBucket] = {}
+        self.host_semaphores: dict[str, asyncio.Semaphore] = {}
+        # Weighted fair queue, (virtual finish time, sequence, bytes, future)
+        self.waiters: list[tuple[float, int, int, asyncio.Future[None]]] = []
+        self.virtual_time = 0.0
+        self.owner_virtual_times: dict[Any, float] = {}
+        self.counter = itertools.count()
+        self.dispatcher: asyncio.Task[None] | None = None
+        self.meter = ThroughputMeter()
+        self.host_meters: defaultdict[str, ThroughputMeter] = defaultdict(
+            ThroughputMeter
+        )
+        self.owner_meters: defaultdict[Any, ThroughputMeter] = defaultdict(
+            ThroughputMeter
+        )
+        self.active_connections: defaultdict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def get_host(url: str):
+        return urlparse(url).hostname or ""
+
+    def set_weight(self, owner: Any, weight: float):
+        self.weights[str(owner)] = weight
+
+    @asynccontextmanager
+    async def connection(self, url: str):
+        """Holds one of the host's connection slots"""
+        host = self.get_host(url)
+        semaphore = None
+        if self.max_connections_per_host:
+            semaphore = self.host_semaphores.setdefault(
+                host, asyncio.Semaphore(self.max_connections_per_host)
+            )
+            await semaphore.acquire()
+        self.active_connections[host] += 1
+        try:
+            yield
+        finally:
+            self.active_connections[host] -= 1
+            if semaphore:
+                semaphore.release()
+
+    async def throttle(self, url: str, amount: int, owner: Any = None):
+        """Waits until amount bytes (already read or about to be) fit in the caps"""
+        host = self.get_host(url)
+        if self.max_bytes_per_second_per_host:
+            bucket = self.host_buckets.get(host)
+            if not bucket:
+                bucket = TokenBucket(
+                    self.max_bytes_per_second_per_host,
+                    self.max_bytes_per_second_per_host,
+                )
+                self.host_buckets[host] = bucket
+            await bucket.acquire(amount)
+        if self.global_bucket:
+            await self.acquire_fair_share(amount, owner)
+        self.meter.add(amount)
+        self.host_meters[host].add(amount)
+        self.owner_meters[owner].add(amount)
+
+    async def acquire_fair_share(self, amount: int, owner: Any):
+        weight = self.weights.get(str(owner), 1)
+        start = max(self.owner_virtual_times.get(owner, 0), self.virtual_time)
+        finish = start + amount / weight
+        self.owner_virtual_times[owner] = finish
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (finish, next(self.counter), amount, future))
+        if not self.dispatcher or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self.dispatch())
+        await future
+
+    async def dispatch(self):
+        bucket = self.global_bucket
+        assert bucket
+        while self.waiters:
+            finish, _count, amount, future = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            bucket.refill()
+            required = min(amount, bucket.capacity)
+            if bucket.tokens < required:
+                # Only pick who goes next once there are tokens, whoever queued meanwhile may be owed more
+                await asyncio.sleep((required - bucket.tokens) / bucket.rate)
+                continue
+            heapq.heappop(self.waiters)
+            bucket.tokens -= amount
+            self.virtual_time = finish
+            future.set_result(None)
+
+    def get_metrics(self):
+        """
+        Returns:
+            dict[str, Any]: Total bytes and bytes per second, overall, per host and per owner
+        """
+        return {
+            "total_bytes": self.meter.total_bytes,
+            "bytes_per_second": self.meter.get_rate(),
+            "hosts": {
+                host: {
+                    "total_bytes": meter.total_bytes,
+                    "bytes_per_second": meter.get_rate(),
+                    "active_connections": self.active_connections[host],
+                }
+                for host, meter in self.host_meters.items()
+            },
+            "owners": {
+                owner: {
+                    "total_bytes": meter.total_bytes,
+                    "bytes_per_second": meter.get_rate(),
+                }
+                for owner, meter in self.owner_meters.items()
+            },
+        }
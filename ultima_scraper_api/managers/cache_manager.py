@@ -0,0 +1,167 @@
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+# Path regex: seconds to keep the response for. Anything that doesn't match isn't cached.
+DEFAULT_TTLS: dict[str, float] = {
+    r"^/api2/v2/users/[^/]+$": 60 * 60,
+    r"^/api2/v2/lists$": 60 * 10,
+    r"/stories/highlights$": 60 * 60,
+    r"/social/(buttons|spotify)$": 60 * 60 * 24,
+    r"^/api2/v2/subscriptions/count/": 60 * 5,
+}
+
+
+class CachedResponse:
+    def __init__(
+        self,
+        body: bytes,
+        etag: str | None,
+        last_modified: str | None,
+        stored_at: float,
+    ) -> None:
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl: float):
+        return time.time() - self.stored_at < ttl
+
+    def get_validators(self):
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite backed cache for json_request responses, evicted least recently used first once max_size (bytes) is reached
+
+    Keys are the URL (path and query), the signed sign/time headers aren't part of it.
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        ttls: dict[str, float] = DEFAULT_TTLS,
+        max_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.filepath = filepath
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls.items()]
+        self.max_size = max_size
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self.connection.commit()
+        self.size: int = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def get_ttl(self, url: str) -> float | None:
+        path = urlparse(url).path
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    @staticmethod
+    def create_key(url: str, namespace: Any = ""):
+        parsed_url = urlparse(url)
+        path = parsed_url.path
+        if parsed_url.query:
+            path = f"{path}?{parsed_url.query}"
+        return f"{namespace}:{parsed_url.hostname}{path}"
+
+    def get(self, key: str) -> CachedResponse | None:
+        row = self.connection.execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if not row:
+            return None
+        self.connection.execute(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+        )
+        self.connection.commit()
+        return CachedResponse(*row)
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        if len(body) > self.max_size:
+            return
+        self.delete(key, commit=False)
+        now = time.time()
+        self.connection.execute(
+            "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, body, etag, last_modified, now, now, len(body)),
+        )
+        self.size += len(body)
+        self.evict()
+        self.connection.commit()
+
+    def revalidated(self, key: str):
+        # 304 Not Modified, the cached body is good for another ttl
+        now = time.time()
+        self.connection.execute(
+            "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+            (now, now, key),
+        )
+        self.connection.commit()
+
+    def delete(self, key: str, commit: bool = True):
+        # Selected first, DELETE ... RETURNING needs SQLite 3.35+
+        row = self.connection.execute(
+            "SELECT size FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row:
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.size -= row[0]
+        if commit:
+            self.connection.commit()
+
+    def evict(self):
+        while self.size > self.max_size:
+            rows = self.connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                break
+            victims: list[tuple[str]] = []
+            for key, size in rows:
+                victims.append((key,))
+                self.size -= size
+                if self.size <= self.max_size:
+                    break
+            self.connection.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self):
+        self.connection.execute("DELETE FROM responses")
+        self.connection.commit()
+        self.size = 0
+
+    def close(self):
+        self.connection.close()
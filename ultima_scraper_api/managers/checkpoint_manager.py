@@ -0,0 +1,85 @@
+import asyncio
+from pathlib import Path
+
+import dill
+from ultima_scraper_api.managers.job_manager.job_manager import JobManager
+from ultima_scraper_api.managers.job_manager.jobs.custom_job import CustomJob
+
+
+class CheckpointManager:
+    """Persists job progress (cursors, pending media) so a crashed run can pick up where it stopped
+
+    Checkpoints are the jobs' create_checkpoint copies, keyed by owner and title, all dilled together.
+    """
+
+    def __init__(self, filepath: Path, interval: float = 30) -> None:
+        self.filepath = filepath
+        self.interval = interval
+        self.checkpoints: dict[str, CustomJob] = {}
+        self.watcher: asyncio.Task[None] | None = None
+        self.load()
+
+    @staticmethod
+    def create_key(job: CustomJob):
+        return f"{job.owner}:{job.title}"
+
+    def load(self):
+        if self.filepath.exists() and self.filepath.stat().st_size:
+            self.checkpoints = dill.loads(self.filepath.read_bytes())  # type: ignore
+        return self.checkpoints
+
+    def save(self, jobs: list[CustomJob]):
+        for job in jobs:
+            key = self.create_key(job)
+            if job.status == "finished":
+                # Nothing left to resume
+                self.checkpoints.pop(key, None)
+                continue
+            self.checkpoints[key] = job.create_checkpoint()
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        temp_filepath = self.filepath.with_suffix(".tmp")
+        temp_filepath.write_bytes(dill.dumps(self.checkpoints))  # type: ignore
+        temp_filepath.replace(self.filepath)
+
+    def restore(self, jobs: list[CustomJob]):
+        """Restores the progress of jobs that have a checkpoint
+
+        Returns:
+            list[CustomJob]: The jobs that were restored
+        """
+        restored_jobs: list[CustomJob] = []
+        for job in jobs:
+            checkpoint = self.checkpoints.get(self.create_key(job))
+            if checkpoint:
+                job.restore(checkpoint)
+                restored_jobs.append(job)
+        return restored_jobs
+
+    def clear(self, job: CustomJob | None = None):
+        if job:
+            self.checkpoints.pop(self.create_key(job), None)
+        else:
+            self.checkpoints.clear()
+        if self.filepath.exists():
+            self.filepath.unlink()
+        if self.checkpoints:
+            self.save([])
+
+    def watch(self, job_manager: JobManager):
+        """Saves job_manager's jobs every interval until stop() is called"""
+
+        async def watcher():
+            while True:
+                await asyncio.sleep(self.interval)
+                self.save(job_manager.jobs)
+
+        self.watcher = asyncio.create_task(watcher())
+        return self.watcher
+
+    async def stop(self, job_manager: JobManager | None = None):
+        if self.watcher:
+            self.watcher.cancel()
+            await asyncio.gather(self.watcher, return_exceptions=True)
+            self.watcher = None
+        if job_manager:
+            self.save(job_manager.jobs)
@@ -0,0 +1,157 @@
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Literal
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+# ioctl(dest_fd, FICLONE, src_fd), copy-on-write clone on btrfs, xfs, etc.
+FICLONE = 0x40049409
+
+LinkMethod = Literal["hardlink", "reflink", "copy"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS medias (
+    media_id INTEGER PRIMARY KEY,
+    filepath TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS medias_content_hash ON medias (content_hash);
+"""
+
+
+class DedupIndex:
+    """Persistent index of downloaded media, by media id and optionally by content hash
+
+    The same media turns up in posts, messages, paid content and previews, DownloadManager checks here first
+    and links the file that's already on disk instead of downloading it again.
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        hash_algorithm: str | None = "sha256",
+        link_methods: list[LinkMethod] = ["hardlink", "reflink"],
+    ) -> None:
+        """
+        Args:
+            hash_algorithm (str | None, optional): Hashes new downloads so identical files with different media ids are linked too, None to skip hashing. Defaults to "sha256".
+            link_methods (list[LinkMethod], optional): Tried in order, add "copy" to still skip the download when linking isn't possible.
+        """
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.filepath = filepath
+        self.hash_algorithm = hash_algorithm
+        self.link_methods = link_methods
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def get(self, media_id: int) -> Path | None:
+        """
+        Returns:
+            Path | None: Where media_id was downloaded to, if it's still there
+        """
+        row = self.connection.execute(
+            "SELECT filepath, size FROM medias WHERE media_id = ?", (media_id,)
+        ).fetchone()
+        return self.validate(media_id, row)
+
+    def find_by_hash(self, content_hash: str) -> Path | None:
+        rows = self.connection.execute(
+            "SELECT media_id, filepath, size FROM medias WHERE content_hash = ?",
+            (content_hash,),
+        ).fetchall()
+        for media_id, *row in rows:
+            filepath = self.validate(media_id, row)
+            if filepath:
+                return filepath
+        return None
+
+    def validate(self, media_id: int, row: Any) -> Path | None:
+        if not row:
+            return None
+        filepath = Path(row[0])
+        try:
+            if filepath.stat().st_size == row[1]:
+                return filepath
+        except OSError:
+            pass
+        # Deleted or changed since, don't link to it
+        self.delete(media_id)
+        return None
+
+    def add(self, media_id: int, filepath: Path, content_hash: str | None = None):
+        self.connection.execute(
+            """INSERT INTO medias (media_id, filepath, size, content_hash, added_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (media_id) DO UPDATE SET
+                filepath = excluded.filepath,
+                size = excluded.size,
+                content_hash = COALESCE(excluded.content_hash, medias.content_hash),
+                added_at = excluded.added_at""",
+            (
+                media_id,
+                str(filepath.absolute()),
+                filepath.stat().st_size,
+                content_hash,
+                time.time(),
+            ),
+        )
+        self.connection.commit()
+
+    def delete(self, media_id: int):
+        self.connection.execute("DELETE FROM medias WHERE media_id = ?", (media_id,))
+        self.connection.commit()
+
+    def link(self, source: Path, destination: Path) -> LinkMethod | None:
+        """Makes destination the same file as source, without downloading it
+
+        Returns:
+            LinkMethod | None: How it was linked, None if none of the link_methods worked
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp_destination = destination.with_name(f"{destination.name}.link")
+        for method in self.link_methods:
+            if temp_destination.exists():
+                temp_destination.unlink()
+            try:
+                match method:
+                    case "hardlink":
+                        os.link(source, temp_destination)
+                    case "reflink":
+                        if not fcntl:
+                            continue
+                        with (
+                            source.open("rb") as source_file,
+                            temp_destination.open("wb") as destination_file,
+                        ):
+                            fcntl.ioctl(
+                                destination_file.fileno(), FICLONE, source_file.fileno()
+                            )
+                    case "copy":
+                        shutil.copyfile(source, temp_destination)
+            except OSError:
+                continue
+            os.replace(temp_destination, destination)
+            return method
+        if temp_destination.exists():
+            temp_destination.unlink()
+        return None
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import aiofiles
+from aiohttp import ClientResponse
+from aiohttp.client_exceptions import ClientResponseError
+from ultima_scraper_api.managers.session_manager import (
+    EXCEPTION_TEMPLATE,
+    RequestRetryError,
+)
+
+if TYPE_CHECKING:
+    from ultima_scraper_api.managers.bandwidth_manager import BandwidthGovernor
+    from ultima_scraper_api.managers.dedup_manager import DedupIndex
+    from ultima_scraper_api.managers.job_manager.jobs.custom_job import CustomJob
+    from ultima_scraper_api.managers.session_manager import SessionManager
+
+MiB = 1024 * 1024
+
+
+class DownloadError(Exception):
+    def __init__(self, url: str, reason: str) -> None:
+        self.url = url
+        self.reason = reason
+        super().__init__(f"Failed to download {url}: {reason}")
+
+
+class DownloadManager:
+    """Streams media to disk through the session manager, e.g. DownloadManager(authed.session_manager)
+
+    Downloads go to "<filepath>.part" first and are only renamed to filepath once complete and verified,
+    an interrupted download resumes from the .part file with a Range request.
+    """
+
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        chunk_size: int = MiB,
+        max_segments: int = 4,
+        min_segment_size: int = 32 * MiB,
+        bandwidth_governor: BandwidthGovernor | None = None,
+        dedup_index: DedupIndex | None = None,
+    ) -> None:
+        """
+        Args:
+            chunk_size (int, optional): Bytes held in memory per connection before they're written. Defaults to 1 MiB.
+            max_segments (int, optional): Connections used for a single large file, 1 disables segmenting. Defaults to 4.
+            min_segment_size (int, optional): Files are only segmented if every segment is at least this big. Defaults to 32 MiB.
+            bandwidth_governor (BandwidthGovernor, optional): Defaults to the api's, shared by every auth.
+            dedup_index (DedupIndex, optional): Defaults to the api's, if it has one.
+        """
+        self.session_manager = session_manager
+        self.bandwidth_governor = (
+            bandwidth_governor or session_manager.auth.api.bandwidth_governor
+        )
+        self.dedup_index = dedup_index or session_manager.auth.api.dedup_index
+        self.chunk_size = chunk_size
+        self.max_segments = max_segments
+        self.min_segment_size = min_segment_size
+
+    @staticmethod
+    def get_part_path(filepath: Path, byte_range: tuple[int, int] | None = None):
+        # Segments are named after their range so a different split never reuses them
+        suffix = ".part" if byte_range is None else ".{}-{}.part".format(*byte_range)
+        return filepath.with_name(f"{filepath.name}{suffix}")
+
+    @staticmethod
+    def get_total_size(response: ClientResponse) -> int | None:
+        # Content-Range: bytes 100-999/1000
+        content_range = response.headers.get("Content-Range", "")
+        match = re.search(r"/(\d+)$", content_range)
+        if match:
+            return int(match.group(1))
+        if response.status == 200 and response.content_length is not None:
+            return response.content_length
+        return None
+
+    async def open_range(self, url: str, start: int, end: int | None = None):
+        """
+        Returns:
+            ClientResponse | None: A 200 or 206 response to stream, None if nothing is left in the range
+        """
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = await self.session_manager.request(
+                url, premade_settings="", extra_headers={"Range": byte_range}
+            )
+        except ClientResponseError as _e:
+            if _e.status == 416:
+                # Nothing left in the requested range
+                return None
+            raise DownloadError(url, f"status {_e.status}") from _e
+        except RequestRetryError as _e:
+            raise DownloadError(url, _e.reason) from _e
+        if response.status in [200, 206]:
+            return response
+        # Statuses the retry policy hands back (403, 404, ...) aren't streamed, give the connection back
+        response.release()
+        if response.status == 416:
+            return None
+        raise DownloadError(url, f"status {response.status}")
+
+    async def download_range(
+        self, url: str, part_path: Path, start: int = 0, end: int | None = None
+    ):
+        """Downloads [start, end] (inclusive, end=None is the end of the file) into part_path, resuming from what's already there
+
+        Returns:
+            int | None: The file's total size if the server told us
+        """
+        policy = self.session_manager.retry_policy
+        governor = self.bandwidth_governor
+        total_size = None
+        attempts = 0
+        while True:
+            written = part_path.stat().st_size if part_path.exists() else 0
+            if end is not None and start + written > end:
+                return total_size
+            async with governor.connection(url):
+                response = await self.open_range(url, start + written, end)
+                if response is None:
+                    return total_size
+                result = await self.stream_response(
+                    url, response, part_path, start, end, written, total_size
+                )
+            if isinstance(result, BaseException):
+                attempts += 1
+                if attempts >= policy.max_attempts:
+                    raise DownloadError(url, repr(result)) from result
+                await asyncio.sleep(policy.get_delay(attempts))
+                continue
+            return result
+
+    async def stream_response(
+        self,
+        url: str,
+        response: ClientResponse,
+        part_path: Path,
+        start: int,
+        end: int | None,
+        written: int,
+        total_size: int | None,
+    ):
+        """
+        Returns:
+            int | None | BaseException: The file's total size, or the connection error to retry after
+        """
+        governor = self.bandwidth_governor
+        owner = self.session_manager.auth.id
+        async with response:
+            if response.status not in [200, 206]:
+                raise DownloadError(url, f"status {response.status}")
+            total_size = self.get_total_size(response) or total_size
+            mode = "ab"
+            if response.status == 200 and (start or written or end is not None):
+                if start or end is not None:
+                    raise DownloadError(url, "server doesn't support ranges")
+                # The whole file was sent, start over
+                mode = "wb"
+            try:
+                async with aiofiles.open(part_path, mode) as part_file:
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        await part_file.write(chunk)
+                        await governor.throttle(url, len(chunk), owner)
+            except EXCEPTION_TEMPLATE as _e:
+                return _e
+        return total_size
+
+    async def download(
+        self,
+        url: str,
+        filepath: Path,
+        expected_size: int | None = None,
+        checksum: str | None = None,
+        checksum_algorithm: str = "md5",
+        segments: int | None = None,
+        media_id: int | None = None,
+        job: CustomJob | None = None,
+    ):
+        """Downloads url to filepath, or links it from an earlier download of the same media
+
+        Args:
+            filepath (Path): Final path, e.g. built from the file_directory_format setting
+            expected_size (int, optional): Size in bytes to verify against, defaults to what the server reports.
+            checksum (str, optional): Hex digest to verify against.
+            segments (int, optional): Parallel connections, defaults to as many as max_segments and min_segment_size allow.
+            media_id (int, optional): Looked up in and added to the dedup index.
+            job (CustomJob, optional): The media is taken off the job's pending media once it's on disk.
+
+        Raises:
+            DownloadError: The download failed or didn't verify, a .part file that didn't verify is deleted
+
+        Returns:
+            Path: filepath
+        """
+        if filepath.exists() and (
+            expected_size is None or filepath.stat().st_size == expected_size
+        ):
+            if job and media_id is not None:
+                job.complete_media(media_id)
+            return filepath
+        dedup_index = self.dedup_index
+        if dedup_index and media_id is not None:
+            source = dedup_index.get(media_id)
+            if (
+                source
+                and source != filepath.absolute()
+                and (expected_size is None or source.stat().st_size == expected_size)
+                and dedup_index.link(source, filepath)
+            ):
+                if job:
+                    job.complete_media(media_id)
+                return filepath
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        part_path = self.get_part_path(filepath)
+        total_size = expected_size
+        segments = segments or self.max_segments
+        supports_ranges = None
+        if total_size is None and not part_path.exists():
+            total_size, supports_ranges = await self.get_remote_size(url)
+        if total_size:
+            segments = min(segments, total_size // self.min_segment_size)
+        if segments > 1 and supports_ranges is None and not part_path.exists():
+            # expected_size skipped the probe, segments are only an option if the server honours Range
+            _remote_size, supports_ranges = await self.get_remote_size(url)
+        if total_size and segments > 1 and supports_ranges and not part_path.exists():
+            await self.download_segments(url, filepath, total_size, segments)
+        else:
+            total_size = await self.download_range(url, part_path) or total_size
+        self.verify(url, part_path, expected_size or total_size)
+        if checksum:
+            digest = await asyncio.to_thread(
+                self.hash_file, part_path, checksum_algorithm
+            )
+            if digest.lower() != checksum.lower():
+                part_path.unlink()
+                raise DownloadError(url, f"checksum mismatch ({digest})")
+        os.replace(part_path, filepath)
+        if media_id is not None:
+            if dedup_index:
+                await self.add_to_dedup_index(dedup_index, media_id, filepath)
+            if job:
+                job.complete_media(media_id)
+        return filepath
+
+    async def add_to_dedup_index(
+        self, dedup_index: DedupIndex, media_id: int, filepath: Path
+    ):
+        content_hash = None
+        if dedup_index.hash_algorithm:
+            content_hash = await asyncio.to_thread(
+                self.hash_file, filepath, dedup_index.hash_algorithm
+            )
+            source = dedup_index.find_by_hash(content_hash)
+            if source and source != filepath.absolute():
+                # Same file under another media id, keep a single copy on disk
+                dedup_index.link(source, filepath)
+        dedup_index.add(media_id, filepath, content_hash)
+
+    async def get_remote_size(self, url: str) -> tuple[int | None, bool]:
+        """
+        Returns:
+            tuple[int | None, bool]: The size if known and whether Range requests are supported
+        """
+        response = await self.open_range(url, 0, 0)
+        if response is None:
+            return None, False
+        async with response:
+            return self.get_total_size(response), response.status == 206
+
+    async def download_segments(
+        self, url: str, filepath: Path, total_size: int, segments: int
+    ):
+        segment_size = -(-total_size // segments)
+        ranges = [
+            (start, min(start + segment_size, total_size) - 1)
+            for start in range(0, total_size, segment_size)
+        ]
+        segment_paths = [self.get_part_path(filepath, x) for x in ranges]
+        await asyncio.gather(
+            *[
+                self.download_range(url, segment_path, start, end)
+                for segment_path, (start, end) in zip(segment_paths, ranges)
+            ]
+        )
+        await asyncio.to_thread(
+            self.join_segments, segment_paths, self.get_part_path(filepath)
+        )
+
+    def join_segments(self, segment_paths: list[Path], part_path: Path):
+        temp_path = part_path.with_name(f"{part_path.name}.tmp")
+        with temp_path.open("wb") as part_file:
+            for segment_path in segment_paths:
+                with segment_path.open("rb") as segment_file:
+                    while chunk := segment_file.read(self.chunk_size):
+                        part_file.write(chunk)
+        os.replace(temp_path, part_path)
+        for segment_path in segment_paths:
+            segment_path.unlink()
+
+    def verify(self, url: str, part_path: Path, expected_size: int | None):
+        size = part_path.stat().st_size if part_path.exists() else 0
+        if expected_size is not None and size != expected_size:
+            if size > expected_size:
+                part_path.unlink()
+            raise DownloadError(url, f"expected {expected_size} bytes, got {size}")
+
+    def hash_file(self, filepath: Path, algorithm: str):
+        file_hash = hashlib.new(algorithm)
+        with filepath.open("rb") as file:
+            while chunk := file.read(self.chunk_size):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import operator
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import orjson
+from aiohttp import ClientSession, ClientTimeout
+
+
+@lru_cache(maxsize=8192)
+def get_signing_path(link: str) -> tuple[str, bool]:
+    """
+    Returns:
+        tuple[str, bool]: The path (and query) that's signed and whether there was a query
+    """
+    parsed = urlparse(link)
+    if parsed.query:
+        return f"{parsed.path}?{parsed.query}", True
+    return parsed.path, False
+
+
+class RequestSigner:
+    """Signs requests with one version of the dynamic rules, everything that doesn't depend on the request is worked out once"""
+
+    def __init__(self, rules: dict[str, Any]) -> None:
+        self.rules = rules
+        self.prefix = f"{rules['static_param']}\n"
+        checksum_indexes: list[int] = rules["checksum_indexes"]
+        self.get_checksum_bytes: Callable[[bytes], tuple[int, ...]]
+        # itemgetter needs at least one index and returns a single value rather than a tuple for one
+        match len(checksum_indexes):
+            case 0:
+                self.get_checksum_bytes = lambda x: ()
+            case 1:
+                index = checksum_indexes[0]
+                self.get_checksum_bytes = lambda x: (x[index],)
+            case _:
+                self.get_checksum_bytes = operator.itemgetter(*checksum_indexes)
+        self.checksum_constant: int = rules["checksum_constant"]
+        self.format = rules["format"].format
+
+    def sign_path(self, path: str, final_time: str, auth_id: str):
+        message = f"{self.prefix}{final_time}\n{path}\n{auth_id}"
+        sha_1_sign = hashlib.sha1(message.encode("utf-8")).hexdigest()
+        checksum_bytes = self.get_checksum_bytes(sha_1_sign.encode("ascii"))
+        checksum = sum(checksum_bytes) + self.checksum_constant
+        return self.format(sha_1_sign, abs(checksum))
+
+    def sign(
+        self,
+        link: str,
+        auth_id: int = 0,
+        query_auth_id: int | None = None,
+        time_: int | None = None,
+    ):
+        """
+        Args:
+            query_auth_id (int, optional): Signed instead of auth_id (and sent as user-id) when link has a query.
+        """
+        final_time = str(int(round(time.time()))) if not time_ else str(time_)
+        headers: dict[str, Any] = {}
+        path, has_query = get_signing_path(link)
+        if has_query:
+            auth_id = query_auth_id or auth_id
+            headers["user-id"] = str(auth_id)
+        headers["sign"] = self.sign_path(path, final_time, str(auth_id))
+        headers["time"] = final_time
+        return headers
+
+
+class DynamicRules:
+    """The signing rules behind a dynamic_rules_link, fetched once per process and shared by every auth
+
+    The last copy is kept in cache_directory, so starting up only waits on the network when it's older than ttl,
+    and a background task keeps refreshing it while the process runs.
+    Once a fetch fails, stale rules are used as they are and only the background task retries, every retry_interval seconds.
+    """
+
+    instances: dict[str, "DynamicRules"] = {}
+
+    def __init__(
+        self,
+        link: str,
+        cache_directory: Path | None = None,
+        ttl: float = 60 * 60,
+        retry_interval: float = 60,
+    ) -> None:
+        """
+        Args:
+            cache_directory (Path, optional): Where the last copy is kept, None to always fetch on startup.
+        """
+        self.link = link
+        self.filepath = (
+            cache_directory.joinpath(
+                f"{hashlib.sha1(link.encode()).hexdigest()[:16]}.json"
+            )
+            if cache_directory
+            else None
+        )
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.rules: dict[str, Any] = {}
+        self.fetched_at = 0.0
+        self.last_attempt_at = 0.0
+        self.signer: RequestSigner | None = None
+        self.refresher: asyncio.Task[None] | None = None
+        # Locks and tasks belong to a loop, they're recreated if another loop uses the rules
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.lock = asyncio.Lock()
+        self.load()
+
+    @classmethod
+    def get_instance(cls, link: str, cache_directory: Path | None = None):
+        """The instance for link, cache_directory is only used by the first caller"""
+        instance = cls.instances.get(link)
+        if instance is None:
+            instance = cls(link, cache_directory)
+            cls.instances[link] = instance
+        return instance
+
+    def load(self):
+        if not self.filepath or not self.filepath.exists():
+            return
+        try:
+            cached = orjson.loads(self.filepath.read_bytes())
+        except orjson.JSONDecodeError:
+            return
+        self.rules = cached["rules"]
+        self.fetched_at = cached["fetched_at"]
+
+    def save(self):
+        if not self.filepath:
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        temp_filepath = self.filepath.with_suffix(".tmp")
+        temp_filepath.write_bytes(
+            orjson.dumps({"fetched_at": self.fetched_at, "rules": self.rules})
+        )
+        temp_filepath.replace(self.filepath)
+
+    def get_signer(self):
+        # Rebuilt whenever the rules are replaced
+        if self.signer is None or self.signer.rules is not self.rules:
+            self.signer = RequestSigner(self.rules)
+        return self.signer
+
+    def is_fresh(self):
+        return bool(self.rules) and time.time() - self.fetched_at < self.ttl
+
+    def is_backing_off(self):
+        # A fetch failed recently, there's no point in everyone waiting on the next one
+        return (
+            bool(self.rules)
+            and self.last_attempt_at > self.fetched_at
+            and time.time() - self.last_attempt_at < self.retry_interval
+        )
+
+    def bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.lock = asyncio.Lock()
+            self.refresher = None
+
+    async def fetch(self):
+        async with ClientSession(
+            timeout=ClientTimeout(total=30), trust_env=True
+        ) as session:
+            async with session.get(self.link) as response:
+                response.raise_for_status()
+                rules = orjson.loads(await response.read())
+        self.rules = rules
+        self.fetched_at = time.time()
+        self.save()
+        return rules
+
+    async def refresh(self, force: bool = False):
+        """Fetches the rules unless another caller already did, a failed fetch keeps the stale rules if there are any"""
+        self.bind_loop()
+        async with self.lock:
+            if not force and (self.is_fresh() or self.is_backing_off()):
+                return self.rules
+            self.last_attempt_at = time.time()
+            try:
+                return await self.fetch()
+            except Exception:
+                if not self.rules:
+                    raise
+                return self.rules
+
+    async def get(self):
+        """
+        Returns:
+            dict[str, Any]: The rules, waits on a fetch if they're older than ttl and only falls back to stale rules if it fails.
+                Stale rules are returned straight away while another caller's fetch is in flight or after one failed.
+        """
+        self.bind_loop()
+        if not self.is_fresh():
+            if not self.rules or not (self.lock.locked() or self.is_backing_off()):
+                await self.refresh()
+        if not self.refresher or self.refresher.done():
+            self.refresher = asyncio.create_task(self.refresher_loop())
+        return self.rules
+
+    async def refresher_loop(self):
+        while True:
+            # A failed attempt is retried after retry_interval, the stale rules are used meanwhile
+            refresh_at = max(
+                self.fetched_at + self.ttl, self.last_attempt_at + self.retry_interval
+            )
+            await asyncio.sleep(max(refresh_at - time.time(), 0))
+            try:
+                await self.refresh(force=True)
+            except Exception:
+                pass
+
+    async def close(self):
+        if self.refresher:
+            self.refresher.cancel()
+            if self.loop is asyncio.get_running_loop():
+                await asyncio.gather(self.refresher, return_exceptions=True)
+            self.refresher = None
@@ -1,34 +1,77 @@
 import asyncio
 import copy
+import inspect
+import itertools
+from collections import Counter, defaultdict, deque
 from typing import Any
 
 import ultima_scraper_api
-from ultima_scraper_api.managers.job_manager.jobs.custom_job import CustomJob
+from ultima_scraper_api.managers.job_manager.jobs.custom_job import (
+    CustomJob,
+    JobStatus,
+)
 
 api_types = ultima_scraper_api.api_types
 
 user_types = ultima_scraper_api.user_types
 
+# Lower runs first, api_types that aren't listed get DEFAULT_PRIORITY
+JOB_PRIORITIES: dict[str, int] = {
+    "Messages": 0,
+    "Stories": 1,
+    "Highlights": 1,
+    "Posts": 2,
+    "MassMessages": 3,
+    "Archived": 4,
+}
+DEFAULT_PRIORITY = 3
+
 
 class JobManager:
-    def __init__(self) -> None:
+    def __init__(self, max_workers: int = 4, max_jobs_per_auth: int = 2) -> None:
+        """Runs queued jobs on a pool of workers, by priority
+
+        Args:
+            max_workers (int, optional): Jobs that can run at once. Defaults to 4.
+            max_jobs_per_auth (int, optional): Jobs with the same owner that can run at once, 0 = unlimited. Defaults to 2.
+        """
         self.jobs: list[CustomJob] = []
-        self.queue: asyncio.Queue[Any] = asyncio.Queue()
-        self.worker_task = asyncio.create_task(self.worker())
+        self.queue: asyncio.PriorityQueue[tuple[int, int, CustomJob]] = (
+            asyncio.PriorityQueue()
+        )
+        self.max_workers = max_workers
+        self.max_jobs_per_auth = max_jobs_per_auth
+        self.workers: list[asyncio.Task[None]] = []
+        self.counter = itertools.count()
+        # Jobs waiting on dependencies, on their owner's cap or paused
+        self.waiting: list[CustomJob] = []
+        self.deferred: defaultdict[Any, deque[CustomJob]] = defaultdict(deque)
+        self.paused: list[CustomJob] = []
+        self.running: dict[CustomJob, asyncio.Task[Any]] = {}
+        self.running_per_owner: Counter[Any] = Counter()
+        self.resumed = asyncio.Event()
+        self.resumed.set()
 
     def create_jobs(
-        self, value: str, type_values: list[str], module: Any, module_args: list[Any]
+        self,
+        value: str,
+        type_values: list[str],
+        module: Any,
+        module_args: list[Any],
+        owner: Any = None,
+        dependencies: list[CustomJob] = [],
     ):
         local_jobs: list[CustomJob] = []
         for type_value in type_values:
             local_args = copy.copy(module_args)
+            priority = JOB_PRIORITIES.get(type_value, DEFAULT_PRIORITY)
             match value:
                 case "Scrape":
-                    job = CustomJob(value, type_value)
+                    job = CustomJob(value, type_value, priority, owner, dependencies)
                     local_args.append(type_value)
                     job.task = module(*local_args)
                 case "Download":
-                    job = CustomJob(value, type_value)
+                    job = CustomJob(value, type_value, priority, owner, dependencies)
                     local_args.append(type_value)
                     job.task = module(*local_args)
                 case _:
@@ -43,12 +86,143 @@ class JobManager:
             media_type = [media_type]
         [job.add_media_type(mt) for job in self.jobs for mt in media_type]
 
+    def start(self):
+        self.workers = [x for x in self.workers if not x.done()]
+        while len(self.workers) < self.max_workers:
+            self.workers.append(asyncio.create_task(self.worker()))
+
+    def queue_job(self, job: CustomJob):
+        if job not in self.jobs:
+            self.jobs.append(job)
+        self.start()
+        if not inspect.isawaitable(job.task):
+            self.finish(job, "failed", TypeError(f"{job.title} has no task to run"))
+        elif job.status == "paused":
+            self.paused.append(job)
+        elif job.is_blocked():
+            self.finish(job, "cancelled")
+        elif not job.is_ready():
+            self.waiting.append(job)
+        else:
+            self.queue.put_nowait((job.priority, next(self.counter), job))
+
+    def queue_jobs(self, jobs: list[CustomJob]):
+        for job in jobs:
+            self.queue_job(job)
+
+    async def wait(self, jobs: list[CustomJob] | None = None):
+        jobs = self.jobs if jobs is None else jobs
+        await asyncio.gather(*[job.finished.wait() for job in jobs])
+
+    def cancel(self, job: CustomJob):
+        if job.done:
+            return
+        running_task = self.running.get(job)
+        if running_task:
+            running_task.cancel()
+            return
+        for jobs in [self.waiting, self.paused, *self.deferred.values()]:
+            if job in jobs:
+                jobs.remove(job)
+        # Still queued jobs are skipped by the worker that picks them up
+        self.finish(job, "cancelled")
+
+    def pause(self, job: CustomJob | None = None):
+        """Stops jobs from starting, running jobs carry on
+
+        Args:
+            job (CustomJob, optional): Pauses a single job. Defaults to pausing every job.
+        """
+        if job is None:
+            self.resumed.clear()
+        elif job.status == "pending":
+            job.status = "paused"
+
+    def resume(self, job: CustomJob | None = None):
+        if job is None:
+            self.resumed.set()
+        elif job.status == "paused":
+            job.status = "pending"
+            if job in self.paused:
+                self.paused.remove(job)
+                self.queue_job(job)
+
+    def finish(
+        self,
+        job: CustomJob,
+        status: JobStatus,
+        exception: BaseException | None = None,
+    ):
+        if asyncio.iscoroutine(job.task) and job not in self.running:
+            # Never started, close it so it isn't reported as never awaited
+            job.task.close()
+        job.finish(status, exception)
+        for waiting_job in self.waiting.copy():
+            if waiting_job.is_ready() or waiting_job.is_blocked():
+                self.waiting.remove(waiting_job)
+                self.queue_job(waiting_job)
+
+    def release_owner(self, job: CustomJob):
+        self.running_per_owner[job.owner] -= 1
+        deferred = self.deferred[job.owner]
+        if deferred:
+            deferred_job = deferred.popleft()
+            self.queue.put_nowait(
+                (deferred_job.priority, next(self.counter), deferred_job)
+            )
+
+    async def run_job(self, job: CustomJob):
+        job.status = "running"
+        self.running_per_owner[job.owner] += 1
+        try:
+            running_task = asyncio.ensure_future(job.task)  # type: ignore
+        except TypeError as _e:
+            self.release_owner(job)
+            self.finish(job, "failed", _e)
+            return
+        self.running[job] = running_task
+        try:
+            # wait() keeps the job's cancellation apart from the worker's
+            await asyncio.wait([running_task])
+        finally:
+            if not running_task.done():
+                # The worker itself was cancelled (close()), let the job unwind first
+                running_task.cancel()
+                await asyncio.wait([running_task])
+            # Finished here so wait() never hangs on a job whose worker was cancelled
+            if running_task.cancelled():
+                self.finish(job, "cancelled")
+            elif running_task.exception():
+                self.finish(job, "failed", running_task.exception())
+            else:
+                job.result = running_task.result()
+                self.finish(job, "finished")
+            del self.running[job]
+            self.release_owner(job)
+
     async def worker(self):
         while True:
-            job = await self.queue.get()
-            # We can make jobs work in the background if we make waiting for inputs async
-            await job.task
-
-            self.queue.task_done()
+            _priority, _count, job = await self.queue.get()
+            try:
+                await self.resumed.wait()
+                if job.done:
+                    continue
+                if job.status == "paused":
+                    self.paused.append(job)
+                    continue
+                if (
+                    self.max_jobs_per_auth
+                    and job.owner is not None
+                    and self.running_per_owner[job.owner] >= self.max_jobs_per_auth
+                ):
+                    self.deferred[job.owner].append(job)
+                    continue
+                await self.run_job(job)
+            finally:
+                self.queue.task_done()
 
-            # print(f'{job.type} has been processed')
+    async def close(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
@@ -1,28 +1,161 @@
+import asyncio
 import copy
+from typing import Any, Literal
 
 import dill
 
+JobStatus = Literal["pending", "running", "paused", "cancelled", "failed", "finished"]
+
 
 class CustomJob:
-    def __init__(self, job_type: str, api_type: str) -> None:
+    def __init__(
+        self,
+        job_type: str,
+        api_type: str,
+        priority: int = 0,
+        owner: Any = None,
+        dependencies: list["CustomJob"] = [],
+    ) -> None:
         self.title = f"{job_type}: {api_type}"
         self.type = job_type
         self.api_type = api_type
         self.media_types: list[str] = []
+        # Progress, min out of max
         self.min = 0
+        self.max = 0
         self.task = None
         self.result = []
         self.done = False
         self.options: list[str] = []
         self.blacklist: list[str] = []
+        # Lower runs first
+        self.priority = priority
+        # Jobs with the same owner (usually the auth's id) share the per auth cap
+        self.owner = owner
+        self.dependencies: list[CustomJob] = list(dependencies)
+        self.status: JobStatus = "pending"
+        self.exception: BaseException | None = None
+        self.finished = asyncio.Event()
+        # Resumable progress, see CheckpointManager and ScrapeManager.iter_pages
+        # Order keys (newest first) of the newest item when the crawl started and of the last item handed out
+        self.anchor: Any = None
+        self.cursor: Any = None
+        # Where the cursor was, offsets shift when items are added or removed so it's only a starting point
+        self.cursor_offset = 0
+        # Media id: (order key, offset) of the item it came from, until the media is downloaded
+        self.pending_media: dict[int, tuple[Any, int]] = {}
+        # Once pending_media is full it's cleared, this is where its newest item was
+        self.pending_floor: tuple[Any, int] | None = None
+        self.max_pending_media = 10_000
 
     def add_media_type(self, media_type: str):
         if media_type in self.media_types:
             return
         self.media_types.append(media_type)
 
-    def convert_to_dill(self):
+    def set_total(self, total: int):
+        self.max = total
+
+    def advance(self, amount: int = 1):
+        self.min += amount
+
+    def get_progress(self):
+        """
+        Returns:
+            float: 0 to 1, 0 if the total isn't known
+        """
+        if not self.max:
+            return 1.0 if self.done else 0.0
+        return min(self.min / self.max, 1.0)
+
+    def complete_page(self, offset: int, keys: list[Any]):
+        """Moves the cursor past a page that was handed out
+
+        Args:
+            keys (list[Any]): The page's order keys, None for items outside the order (e.g. pinned posts)
+        """
+        ordered_keys = [x for x in keys if x is not None]
+        if ordered_keys:
+            if self.anchor is None:
+                self.anchor = ordered_keys[0]
+            self.cursor = ordered_keys[-1]
+        self.cursor_offset = offset + len(keys)
+
+    def add_pending_media(self, item: Any, key: Any, offset: int):
+        """Tracks the item's viewable media until complete_media, a restored job hands it out again until then
+
+        Items outside the order (key None) are handed out again on every resume anyway.
+        """
+        if key is None or not isinstance(item, dict):
+            return
+        for media in item.get("media") or []:
+            if media.get("canView", True):
+                self.pending_media[media["id"]] = (key, offset)
+        if len(self.pending_media) > self.max_pending_media:
+            # Nothing is completing them (e.g. no DownloadManager(job=...)), resume from the newest for good
+            self.pending_floor = self.get_resume_point()
+            self.pending_media.clear()
+
+    def complete_media(self, media_id: int):
+        """Call for media that's downloaded or deliberately skipped, see DownloadManager.download"""
+        self.pending_media.pop(media_id, None)
+
+    def get_resume_point(self) -> tuple[Any, int] | None:
+        """
+        Returns:
+            tuple[Any, int] | None: (order key, offset) of the newest item with media that wasn't downloaded
+        """
+        points = list(self.pending_media.values())
+        if self.pending_floor:
+            points.append(self.pending_floor)
+        return max(points, key=lambda x: x[0], default=None)
+
+    def restore(self, checkpoint: "CustomJob"):
+        """Continues from a checkpointed copy of this job"""
+        self.min = checkpoint.min
+        self.max = checkpoint.max
+        self.anchor = checkpoint.anchor
+        self.cursor = checkpoint.cursor
+        self.cursor_offset = checkpoint.cursor_offset
+        self.pending_media = dict(checkpoint.pending_media)
+        self.pending_floor = checkpoint.pending_floor
+        self.media_types = list(checkpoint.media_types)
+
+    def is_ready(self):
+        return all(x.status == "finished" for x in self.dependencies)
+
+    def is_blocked(self):
+        # A dependency that didn't finish will never let this job run
+        return any(x.status in ["cancelled", "failed"] for x in self.dependencies)
+
+    def finish(self, status: JobStatus, exception: BaseException | None = None):
+        self.status = status
+        self.exception = exception
+        self.done = True
+        self.finished.set()
+
+    async def wait(self):
+        await self.finished.wait()
+        return self.result
+
+    def create_checkpoint(self):
+        """A copy with just the progress restore() needs, nothing that might not pickle"""
+        checkpoint = self.create_copy()
+        checkpoint.result = []
+        checkpoint.owner = None
+        checkpoint.exception = None
+        return checkpoint
+
+    def create_copy(self):
         old = copy.copy(self)
-        delattr(old, "task")
+        # Only the job's own state, not what's running it or the jobs it waits on
+        for attr in ["task", "finished", "dependencies"]:
+            delattr(old, attr)
+        old.media_types = list(self.media_types)
+        old.pending_media = dict(self.pending_media)
+        return old
+
+    def convert_to_dill(self, keep_result: bool = True):
+        old = self.create_copy() if keep_result else self.create_checkpoint()
         data_string: bytes = dill.dumps(old)  # type: ignore
         return data_string, old
@@ -0,0 +1,254 @@
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any
+
+import orjson
+from ultima_scraper_api.classes.prepare_metadata import (
+    create_metadata,
+    format_content,
+    global_version,
+)
+from ultima_scraper_api.helpers import main_helper
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    api_type TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'valid',
+    text TEXT,
+    price REAL,
+    paid INTEGER,
+    created_at TEXT,
+    PRIMARY KEY (api_type, post_id)
+);
+CREATE TABLE IF NOT EXISTS medias (
+    api_type TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    media_id INTEGER NOT NULL,
+    media_type TEXT,
+    status TEXT NOT NULL DEFAULT 'valid',
+    links TEXT,
+    directory TEXT,
+    filename TEXT,
+    size INTEGER,
+    downloaded INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (api_type, post_id, media_id)
+);
+CREATE INDEX IF NOT EXISTS medias_media_id ON medias (media_id);
+"""
+
+
+class MetadataStore:
+    """SQLite metadata for a single model, one row per post and per media
+
+    Rows are upserted, so saving after each scrape only writes what changed instead of the whole file.
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.filepath = filepath
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    @staticmethod
+    def create_media_id(media: format_content.media_item) -> int | None:
+        # Legacy media may not have a media_id, give them a stable (negative) one from their link
+        if media.media_id is not None:
+            return int(media.media_id)
+        link = next((x for x in media.links if isinstance(x, str) and x), "")
+        if not link:
+            return None
+        return -1 - zlib.crc32(link.split("?")[0].encode())
+
+    def upsert_posts(
+        self,
+        api_type: str,
+        posts: list[format_content.post_item],
+        status: str = "valid",
+    ):
+        """Inserts or updates posts and their medias
+
+        Local state (directory, filename, size, downloaded) is never overwritten by an empty value.
+        """
+        content_rows: list[tuple[Any, ...]] = []
+        media_rows: list[tuple[Any, ...]] = []
+        for post in posts:
+            content_rows.append(
+                (
+                    api_type,
+                    post.post_id,
+                    status,
+                    post.text,
+                    post.price,
+                    post.paid,
+                    post.createdAt,
+                )
+            )
+            for media in post.medias:
+                media_id = self.create_media_id(media)
+                if media_id is None:
+                    continue
+                media_rows.append(
+                    (
+                        api_type,
+                        post.post_id,
+                        media_id,
+                        media.media_type,
+                        status,
+                        orjson.dumps(media.links).decode(),
+                        media.directory,
+                        media.filename,
+                        media.size,
+                        media.downloaded,
+                    )
+                )
+        with self.connection:
+            self.connection.executemany(
+                """INSERT INTO contents VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (api_type, post_id) DO UPDATE SET
+                    status = excluded.status,
+                    text = excluded.text,
+                    price = excluded.price,
+                    paid = excluded.paid,
+                    created_at = excluded.created_at""",
+                content_rows,
+            )
+            self.connection.executemany(
+                """INSERT INTO medias VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (api_type, post_id, media_id) DO UPDATE SET
+                    media_type = excluded.media_type,
+                    status = excluded.status,
+                    links = excluded.links,
+                    directory = COALESCE(NULLIF(medias.directory, ''), excluded.directory),
+                    filename = COALESCE(NULLIF(medias.filename, ''), excluded.filename),
+                    size = COALESCE(medias.size, excluded.size),
+                    downloaded = MAX(medias.downloaded, excluded.downloaded)""",
+                media_rows,
+            )
+
+    def upsert_metadata(self, api_type: str, metadata: create_metadata):
+        for _media_type, statuses in metadata.content:
+            for status, posts in statuses:
+                self.upsert_posts(api_type, posts, status)
+
+    def set_downloaded(
+        self,
+        api_type: str,
+        post_id: int,
+        media_id: int,
+        directory: str,
+        filename: str,
+        size: int | None = None,
+    ):
+        with self.connection:
+            self.connection.execute(
+                """UPDATE medias SET directory = ?, filename = ?, size = ?, downloaded = 1
+                WHERE api_type = ? AND post_id = ? AND media_id = ?""",
+                (directory, filename, size, api_type, post_id, media_id),
+            )
+
+    def get_post_ids(self, api_type: str) -> set[int]:
+        rows = self.connection.execute(
+            "SELECT post_id FROM contents WHERE api_type = ?", (api_type,)
+        )
+        return {row[0] for row in rows}
+
+    def get_api_types(self) -> list[str]:
+        rows = self.connection.execute("SELECT DISTINCT api_type FROM contents")
+        return [row[0] for row in rows]
+
+    def export(self, api_type: str) -> dict[str, Any]:
+        """Returns the api_type's metadata in the latest json format, create_metadata can load it"""
+        content: dict[str, dict[str, dict[int, dict[str, Any]]]] = {}
+        posts: dict[int, tuple[Any, ...]] = {
+            row[0]: row
+            for row in self.connection.execute(
+                "SELECT post_id, status, text, price, paid, created_at FROM contents WHERE api_type = ?",
+                (api_type,),
+            )
+        }
+
+        def create_post(post_id: int) -> dict[str, Any]:
+            _post_id, _status, text, price, paid, created_at = posts[post_id]
+            return {
+                "post_id": post_id,
+                "text": text,
+                "price": price,
+                "paid": bool(paid),
+                "medias": [],
+                "createdAt": created_at,
+            }
+
+        posts_with_medias: set[int] = set()
+        for row in self.connection.execute(
+            """SELECT post_id, media_id, media_type, status, links, directory, filename, size, downloaded
+            FROM medias WHERE api_type = ? ORDER BY post_id DESC, media_id""",
+            (api_type,),
+        ):
+            post_id, media_id, media_type, status, links, *local_state = row
+            if post_id not in posts:
+                continue
+            posts_with_medias.add(post_id)
+            status_posts = content.setdefault(media_type, {}).setdefault(status, {})
+            if post_id not in status_posts:
+                status_posts[post_id] = create_post(post_id)
+            directory, filename, size, downloaded = local_state
+            status_posts[post_id]["medias"].append(
+                {
+                    "media_id": media_id if media_id >= 0 else None,
+                    "links": orjson.loads(links) if links else [],
+                    "directory": directory,
+                    "filename": filename,
+                    "size": size,
+                    "media_type": media_type,
+                    "downloaded": bool(downloaded),
+                }
+            )
+        for post_id, row in sorted(posts.items(), reverse=True):
+            if post_id not in posts_with_medias:
+                status = row[1]
+                content.setdefault("Texts", {}).setdefault(status, {})[post_id] = (
+                    create_post(post_id)
+                )
+        return {
+            "version": global_version,
+            "content": {
+                media_type: {
+                    status: list(status_posts.values())
+                    for status, status_posts in statuses.items()
+                }
+                for media_type, statuses in content.items()
+            },
+        }
+
+    def migrate(self, legacy_metadata_filepaths: list[Path]):
+        """Imports legacy .json metadata (any version fix_metadata understands), the filename is the api_type
+
+        Returns:
+            list[Path]: Files that were imported and can be deleted
+        """
+        migrated_filepaths: list[Path] = []
+        for legacy_metadata_filepath in legacy_metadata_filepaths:
+            if not legacy_metadata_filepath.exists():
+                continue
+            api_type = legacy_metadata_filepath.stem
+            legacy_metadata_json = main_helper.import_json(legacy_metadata_filepath)
+            if not legacy_metadata_json:
+                continue
+            metadata = create_metadata(legacy_metadata_json, api_type=api_type)
+            self.upsert_metadata(api_type, metadata)
+            migrated_filepaths.append(legacy_metadata_filepath)
+        return migrated_filepaths
+
+    def close(self):
+        self.connection.close()
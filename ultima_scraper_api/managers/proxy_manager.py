@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+import python_socks
+from aiohttp import ClientSession, ClientTimeout
+from aiohttp_socks import ProxyInfo
+
+if TYPE_CHECKING:
+    from ultima_scraper_api.managers.session_manager import ConnectionPool
+
+
+class ProxyState:
+    def __init__(self, url: str, window: int = 20) -> None:
+        self.url = url
+        self.info = ProxyInfo(*python_socks.parse_proxy_url(url))  # type: ignore
+        # Exponentially weighted, None until the first response
+        self.latency: float | None = None
+        self.results: deque[bool] = deque(maxlen=window)
+        self.in_flight = 0
+        self.quarantined_until = 0.0
+        # Consecutive quarantines, each one lasts twice as long as the last
+        self.strikes = 0
+
+    def get_error_rate(self):
+        if not self.results:
+            return 0.0
+        return self.results.count(False) / len(self.results)
+
+    def is_quarantined(self, now: float | None = None):
+        return (now or time.monotonic()) < self.quarantined_until
+
+    def get_score(self, default_latency: float = 1.0):
+        """Lower is better, slow, failing and busy proxies score higher"""
+        latency = default_latency if self.latency is None else self.latency
+        return latency * (1 + 4 * self.get_error_rate()) * (1 + self.in_flight)
+
+
+class ProxyPool:
+    """Routes each request to the healthiest proxy, every proxy keeps its own connector in the ConnectionPool
+
+    Proxies that fail too often (or get rate limited) are quarantined instead of tearing down every in-flight request,
+    check_all() tests proxies concurrently and watch() keeps doing so in the background.
+    """
+
+    def __init__(
+        self,
+        proxies: list[str],
+        connection_pool: ConnectionPool,
+        check_url: str = "https://checkip.amazonaws.com",
+        check_interval: float = 300,
+        quarantine_time: float = 60,
+        max_error_rate: float = 0.5,
+        min_samples: int = 5,
+    ) -> None:
+        """
+        Args:
+            check_interval (float, optional): Seconds between background health checks. Defaults to 300.
+            quarantine_time (float, optional): Seconds a failing proxy sits out the first time. Defaults to 60.
+            max_error_rate (float, optional): Error rate (over the last 20 requests) that quarantines a proxy. Defaults to 0.5.
+            min_samples (int, optional): Requests needed before the error rate counts. Defaults to 5.
+        """
+        self.proxies = [ProxyState(x) for x in proxies]
+        self.connection_pool = connection_pool
+        self.check_url = check_url
+        self.check_interval = check_interval
+        self.quarantine_time = quarantine_time
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.watcher: asyncio.Task[None] | None = None
+
+    def __bool__(self):
+        return bool(self.proxies)
+
+    def get_proxy(self) -> ProxyState | None:
+        if not self.proxies:
+            return None
+        if not self.watcher and self.check_interval:
+            self.watch()
+        now = time.monotonic()
+        healthy = [x for x in self.proxies if not x.is_quarantined(now)]
+        if not healthy:
+            # Better to try the proxy closest to coming back than to fail outright
+            return min(self.proxies, key=lambda x: x.quarantined_until)
+        return min(healthy, key=lambda x: x.get_score())
+
+    def get_connector(self, proxy: ProxyState | None):
+        return self.connection_pool.get_connector(proxy.info if proxy else None)
+
+    def record(self, proxy: ProxyState, latency: float | None, success: bool):
+        if latency is not None:
+            proxy.latency = (
+                latency
+                if proxy.latency is None
+                else proxy.latency * 0.8 + latency * 0.2
+            )
+        proxy.results.append(success)
+        if success:
+            if proxy.get_error_rate() <= self.max_error_rate:
+                proxy.strikes = 0
+        elif (
+            len(proxy.results) >= self.min_samples
+            and proxy.get_error_rate() > self.max_error_rate
+            and not proxy.is_quarantined()
+        ):
+            self.quarantine(proxy)
+
+    def quarantine(self, proxy: ProxyState, duration: float | None = None):
+        if duration is None:
+            duration = self.quarantine_time * 2 ** min(proxy.strikes, 6)
+            proxy.strikes += 1
+        proxy.quarantined_until = max(
+            proxy.quarantined_until, time.monotonic() + duration
+        )
+
+    def penalize(self, proxy: ProxyState, retry_after: float | None = None):
+        """Rate limited (429), sends requests elsewhere for a while without counting it as an error"""
+        self.quarantine(proxy, retry_after or self.quarantine_time)
+
+    async def check(self, proxy: ProxyState, timeout: float = 15):
+        connector, connector_owner = self.get_connector(proxy)
+        started_at = time.monotonic()
+        try:
+            async with ClientSession(
+                connector=connector,
+                connector_owner=connector_owner,
+                timeout=ClientTimeout(total=timeout),
+            ) as session:
+                async with session.get(self.check_url) as response:
+                    await response.read()
+                    success = response.status == 200
+        except Exception as _e:
+            success = False
+        if success:
+            # A passing check ends the quarantine early
+            proxy.results.clear()
+            proxy.quarantined_until = 0.0
+            self.record(proxy, time.monotonic() - started_at, True)
+        else:
+            proxy.results.append(False)
+            self.quarantine(proxy)
+        return success
+
+    async def check_all(self):
+        """
+        Returns:
+            list[ProxyState]: The proxies that passed
+        """
+        results = await asyncio.gather(*[self.check(x) for x in self.proxies])
+        return [proxy for proxy, success in zip(self.proxies, results) if success]
+
+    def watch(self):
+        async def watcher():
+            while True:
+                await self.check_all()
+                await asyncio.sleep(self.check_interval)
+
+        self.watcher = asyncio.create_task(watcher())
+        return self.watcher
+
+    def get_metrics(self):
+        now = time.monotonic()
+        return {
+            proxy.url: {
+                "latency": proxy.latency,
+                "error_rate": proxy.get_error_rate(),
+                "in_flight": proxy.in_flight,
+                "quarantined_for": max(proxy.quarantined_until - now, 0),
+            }
+            for proxy in self.proxies
+        }
+
+    async def close(self):
+        if self.watcher:
+            self.watcher.cancel()
+            await asyncio.gather(self.watcher, return_exceptions=True)
+            self.watcher = None
@@ -1,9 +1,33 @@
 import asyncio
+import operator
+from collections import deque
+from contextlib import aclosing
 from itertools import chain
-from typing import Any
+from typing import Any, AsyncGenerator, Callable
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import orjson
+from aiohttp import ClientResponseError
 
 from ultima_scraper_api.apis.api_helper import handle_error_details
-from ultima_scraper_api.managers.session_manager import SessionManager
+from ultima_scraper_api.managers.job_manager.jobs.custom_job import CustomJob
+from ultima_scraper_api.managers.session_manager import (
+    RequestRetryError,
+    SessionManager,
+    decode_json,
+    request_error_details,
+)
+
+
+class ScrapeError(Exception):
+    def __init__(self, url: str, error: dict[str, Any], result: Any = None) -> None:
+        self.url = url
+        self.error = error
+        # What scrape returns for the page instead
+        self.result = result
+        super().__init__(
+            f"Failed to scrape {url}: {error.get('code')} {error.get('message')}"
+        )
 
 
 class ScrapeManager:
@@ -16,17 +40,278 @@ class ScrapeManager:
         result = await asyncio.gather(
             *[self.scrape(x) for x in urls], return_exceptions=True
         )
-        final_result = list(chain(*result))
+        # A page that raised is left out instead of losing every other page
+        final_result = list(
+            chain(*[x for x in result if not isinstance(x, BaseException)])
+        )
         return final_result
 
-    async def scrape(self, url: str):
+    async def scrape(self, url: str, projection: Callable[[Any], Any] | None = None):
+        """
+        Args:
+            projection (Callable, optional): Applied to each item of the page as soon as it's decoded, see project_page.
+        """
+        try:
+            return await self.fetch_page(url, projection)
+        except ScrapeError as _e:
+            # One bad page doesn't end a bulk_scrape
+            return _e.result
+
+    async def fetch_page(
+        self, url: str, projection: Callable[[Any], Any] | None = None
+    ):
+        """scrape for the paginators, an error page raises ScrapeError so it can't pass for the last page
+
+        Raises:
+            ScrapeError: The error is still passed to handle_error first.
+        """
         session_manager = self.session_manager
         async with session_manager.semaphore:
-            result = await session_manager.request(url)
-            async with result as response:
-                json_res = await response.json()
-                final_result = await self.handle_error(url, json_res)
-                return final_result
+            try:
+                result = await session_manager.request(url)
+            except (RequestRetryError, ClientResponseError) as _e:
+                json_res = {"error": request_error_details(_e)}
+            else:
+                async with result as response:
+                    body = await response.read()
+                    if response.ok:
+                        json_res = decode_json(body)
+                    else:
+                        json_res = self.decode_error(
+                            body, response.status, response.reason
+                        )
+        if isinstance(json_res, dict) and "error" in json_res:
+            error: dict[str, Any] = json_res["error"]
+            raise ScrapeError(url, error, await self.handle_error(url, json_res))
+        if projection:
+            json_res = self.project_page(json_res, projection)
+        return json_res
+
+    async def iter_pages(
+        self,
+        link: str,
+        limit: int,
+        offset: int = 0,
+        lookahead: int | None = None,
+        job: CustomJob | None = None,
+        projection: Callable[[Any], Any] | None = None,
+        order_key: Callable[[Any], Any] | None = None,
+    ) -> AsyncGenerator[list[Any], None]:
+        """Yields offset paginated results page by page, in order.
+
+        Up to `lookahead` pages are requested ahead of the page being consumed.
+        Pagination stops as soon as a page says there's nothing left (hasMore=false or an empty page) and any pages still in flight are cancelled.
+        A page that fails raises ScrapeError, so a crawl that ends without one reached the end of the data.
+
+        Args:
+            link (str): Any page of the endpoint, the limit and offset params are overwritten
+            limit (int): Page size
+            offset (int, optional): Offset to start from. Defaults to 0.
+            lookahead (int, optional): Defaults to session_manager.max_threads.
+            job (CustomJob, optional): Records its progress, a restored job continues from its cursor, see resume_pages.
+            projection (Callable, optional): Yields projection(item) instead of each item, see iter_page_ids.
+            order_key (Callable, optional): Where an item sits in the newest first order, used by job. Defaults to its id, return None for items outside the order (e.g. pinned posts).
+        """
+        if job:
+            order_key = order_key or operator.itemgetter("id")
+            if job.cursor is not None:
+                pages = self.resume_pages(
+                    link, limit, offset, lookahead, job, projection, order_key
+                )
+            else:
+                pages = self.paginate(link, limit, offset, lookahead, projection)
+            async with aclosing(pages) as pages:
+                async for page_offset, items in pages:
+                    keys = [order_key(x) for x in items]
+                    for index, (item, key) in enumerate(zip(items, keys)):
+                        # Items outside the order have no offset, resuming walks forward from 0 to find them
+                        item_offset = 0 if page_offset is None else page_offset + index
+                        job.add_pending_media(item, key, item_offset)
+                    yield items
+                    # Only recorded once the consumer is done with the page
+                    if page_offset is not None:
+                        job.complete_page(page_offset, keys)
+                    job.advance(len(items))
+            return
+        async with aclosing(
+            self.paginate(link, limit, offset, lookahead, projection)
+        ) as pages:
+            async for _page_offset, items in pages:
+                yield items
+
+    async def paginate(
+        self,
+        link: str,
+        limit: int,
+        offset: int = 0,
+        lookahead: int | None = None,
+        projection: Callable[[Any], Any] | None = None,
+    ) -> AsyncGenerator[tuple[int | None, list[Any]], None]:
+        """The pagination behind iter_pages, yields (offset, items) for each page that has items"""
+        lookahead = max(1, lookahead or self.session_manager.max_threads)
+        pending: deque[tuple[int, asyncio.Task[Any]]] = deque()
+        next_offset = offset
+
+        def schedule():
+            nonlocal next_offset
+            url = self.set_page(link, limit, next_offset)
+            task = asyncio.create_task(self.fetch_page(url, projection))
+            pending.append((next_offset, task))
+            next_offset += limit
+
+        try:
+            for _ in range(lookahead):
+                schedule()
+            while pending:
+                page_offset, task = pending.popleft()
+                items, has_more = self.extract_page(await task)
+                if items:
+                    yield page_offset, items
+                if not has_more:
+                    break
+                schedule()
+        finally:
+            for _page_offset, task in pending:
+                task.cancel()
+            await asyncio.gather(*[x[1] for x in pending], return_exceptions=True)
+
+    async def resume_pages(
+        self,
+        link: str,
+        limit: int,
+        offset: int,
+        lookahead: int | None,
+        job: CustomJob,
+        projection: Callable[[Any], Any] | None,
+        order_key: Callable[[Any], Any],
+    ) -> AsyncGenerator[tuple[int | None, list[Any]], None]:
+        """Continues a restored job without trusting its offsets, items added or removed since the checkpoint shift them
+
+        1. Items newer than job.anchor (added since the crawl started) are fetched from the start
+        2. Pagination picks up after job.cursor, or at the newest item whose media weren't downloaded (see CustomJob.get_resume_point),
+           stepping back if the page boundary moved past it
+
+        Offsets (and the cursor) aren't recorded for the first, those items are outside the crawl's order.
+        """
+        anchor = job.anchor
+        newest = None
+        added = 0
+        async with aclosing(
+            self.paginate(link, limit, offset, lookahead, projection)
+        ) as pages:
+            async for _page_offset, items in pages:
+                new_items: list[Any] = []
+                reached_anchor = False
+                for item in items:
+                    key = order_key(item)
+                    if key is not None:
+                        if key <= anchor:
+                            reached_anchor = True
+                            break
+                        newest = key if newest is None else newest
+                        added += 1
+                    new_items.append(item)
+                if new_items:
+                    yield None, new_items
+                if reached_anchor:
+                    break
+        if newest is not None:
+            # Later resumes only need what's newer than this
+            job.anchor = newest
+        resume_point = job.get_resume_point()
+        if resume_point:
+            # Handed out again, the resume point included
+            cursor, cursor_item_offset = resume_point
+        else:
+            cursor, cursor_item_offset = job.cursor, job.cursor_offset - 1
+        page_offset = max(cursor_item_offset + added, offset)
+        while True:
+            url = self.set_page(link, limit, page_offset)
+            items, has_more = self.extract_page(await self.fetch_page(url, projection))
+            first_key = next((x for x in map(order_key, items) if x is not None), None)
+            if page_offset > offset and first_key is not None and first_key < cursor:
+                # Items were removed, the cursor is further back
+                page_offset = max(page_offset - limit, offset)
+                continue
+            break
+        while True:
+            # Items before the cursor were already handed out, unordered ones were in step 1
+            unseen_items: list[Any] = []
+            for item in items:
+                key = order_key(item)
+                if key is not None and (
+                    key <= cursor if resume_point else key < cursor
+                ):
+                    unseen_items.append(item)
+            if unseen_items:
+                # They're the end of the page
+                yield page_offset + len(items) - len(unseen_items), unseen_items
+            if not has_more or unseen_items:
+                break
+            # The whole page was before the cursor, try the next one
+            page_offset += limit
+            url = self.set_page(link, limit, page_offset)
+            items, has_more = self.extract_page(await self.fetch_page(url, projection))
+        if not has_more:
+            return
+        async with aclosing(
+            self.paginate(link, limit, page_offset + limit, lookahead, projection)
+        ) as pages:
+            async for next_offset, items in pages:
+                yield next_offset, items
+
+    async def iter_page_ids(
+        self,
+        link: str,
+        limit: int,
+        offset: int = 0,
+        lookahead: int | None = None,
+    ) -> AsyncGenerator[list[int], None]:
+        """iter_pages for when only the ids are needed (dedup, incremental checks)
+
+        Items are reduced to their id as soon as each page is decoded, so pages waiting in the lookahead don't hold the full payloads.
+        """
+        async for page in self.iter_pages(
+            link, limit, offset, lookahead, projection=operator.itemgetter("id")
+        ):
+            yield page
+
+    @staticmethod
+    def project_page(page: Any, projection: Callable[[Any], Any]):
+        if isinstance(page, dict) and isinstance(page.get("list"), list):
+            return page | {"list": [projection(x) for x in page["list"]]}
+        if isinstance(page, list):
+            return [projection(x) for x in page]
+        return page
+
+    @staticmethod
+    def set_page(link: str, limit: int, offset: int):
+        parsed_link = urlparse(link)
+        query = dict(parse_qsl(parsed_link.query, keep_blank_values=True))
+        query["limit"] = str(limit)
+        query["offset"] = str(offset)
+        return parsed_link._replace(query=urlencode(query)).geturl()
+
+    @staticmethod
+    def extract_page(page: Any) -> tuple[list[dict[str, Any]], bool]:
+        # Endpoints either return a bare list or {"list": [...], "hasMore": bool}
+        if isinstance(page, dict):
+            items: list[dict[str, Any]] = page.get("list", [])
+            return items, page.get("hasMore", bool(items))
+        if isinstance(page, list):
+            return page, bool(page)
+        return [], False
+
+    @staticmethod
+    def decode_error(body: bytes, status: int, reason: str | None) -> dict[str, Any]:
+        # Error responses usually carry {"error": {...}}, anything else is reported by its status
+        try:
+            json_res = decode_json(body)
+        except orjson.JSONDecodeError:
+            json_res = None
+        if isinstance(json_res, dict) and "error" in json_res:
+            return json_res
+        return {"error": {"code": status, "message": reason}}
 
     async def handle_error(self, url: str, json_res: dict[str, Any]):
         import ultima_scraper_api.apis.fansly.classes as fansly_classes
@@ -53,4 +338,4 @@ class ScrapeManager:
         return abc
 
     def set_scraped(self, name: str, scraped: list[Any]):
-        setattr(self.scraped, name, scraped)
\ No newline at end of file
+        setattr(self.scraped, name, scraped)
@@ -1,21 +1,18 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import random
 import string
 import time
-from random import randint
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 from urllib.parse import urlparse
 
 import aiohttp
-import python_socks
-import requests
+import orjson
 import ultima_scraper_api
 import ultima_scraper_api.apis.api_helper as api_helper
-from aiohttp import ClientResponse, ClientSession
+from aiohttp import ClientResponse, ClientSession, CookieJar
 from aiohttp.client_exceptions import (
     ClientConnectorError,
     ClientOSError,
@@ -25,6 +22,8 @@ from aiohttp.client_exceptions import (
     ServerDisconnectedError,
 )
 from aiohttp_socks import ProxyConnectionError, ProxyConnector, ProxyError, ProxyInfo
+from ultima_scraper_api.managers.dynamic_rules_manager import DynamicRules
+from ultima_scraper_api.managers.proxy_manager import ProxyPool, ProxyState
 
 if TYPE_CHECKING:
     auth_types = ultima_scraper_api.auth_types
@@ -37,35 +36,242 @@ EXCEPTION_TEMPLATE = (
     ConnectionResetError,
     asyncio.TimeoutError,
 )
+# host: (requests per second, burst)
+# [OF] 1,000 requests every 5 minutes, we pace at 900 to be safe
+RATE_LIMIT_RULES: dict[str, tuple[float, float]] = {
+    "onlyfans.com": (900 / 300, 30),
+}
 
 
-class ProxyManager:
-    def __init__(self, session_manager: SessionManager) -> None:
-        self.session_manager = session_manager
-        self.proxies = [
-            ProxyInfo(*python_socks.parse_proxy_url(proxy)) for proxy in self.session_manager.proxies  # type: ignore
-        ]
-        self.current_proxy_index = 0
+def decode_json(body: bytes) -> Any:
+    """Decodes a response body with orjson, straight from the bytes without decoding it to text first
 
-    def create_connection(self, proxy: ProxyInfo | None = None):
-        if proxy is None:
-            proxy = self.proxies[0]
-        return ProxyConnector(**proxy._asdict())  # type: ignore
+    An empty body decodes to None, like ClientResponse.json()
+    """
+    return orjson.loads(body) if body.strip() else None
 
-    def get_current_proxy(self):
-        return self.proxies[self.current_proxy_index]
 
-    async def proxy_switcher(self):
-        if self.proxies:
-            self.current_proxy_index = (self.current_proxy_index + 1) % len(
-                self.proxies
-            )
-            await self.session_manager.active_session.close()
-            self.session_manager.active_session = (
-                self.session_manager.create_client_session(
-                    False, self.get_current_proxy()
-                )
-            )
+def request_error_details(exception: RequestRetryError | ClientResponseError):
+    """The {"code", "message"} error a request that raised is reported as, like an error response"""
+    if isinstance(exception, RequestRetryError):
+        return {"code": exception.state.last_status or 0, "message": str(exception)}
+    return {"code": exception.status, "message": exception.message}
+
+
+def default_coalesce_key(url: str) -> str | None:
+    # Every GET to the same url shares a request, return None to opt a url out
+    return url
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.penalized_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1):
+        # Waiters queue on the lock, so requests leave the bucket evenly spaced
+        # instead of bursting once tokens come back.
+        async with self.lock:
+            required = min(amount, self.capacity)
+            while True:
+                self.refill()
+                if self.tokens >= required:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((required - self.tokens) / self.rate)
+
+    def penalize(self, retry_after: float | None = None, cooldown: float = 5):
+        """Halves the rate after a 429
+
+        Returns:
+            bool: False if the bucket was already penalized within the cooldown
+        """
+        self.refill()
+        now = time.monotonic()
+        if now - self.penalized_at < cooldown:
+            return False
+        self.penalized_at = now
+        self.rate = max(self.min_rate, self.rate / 2)
+        wait_time = retry_after if retry_after else 1 / self.rate
+        self.tokens = min(self.tokens, 0) - wait_time * self.rate
+        return True
+
+    def reward(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.01)
+
+    def remaining(self):
+        self.refill()
+        return self.tokens
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rules: dict[str, tuple[float, float]] = RATE_LIMIT_RULES,
+        fallback_rule: tuple[float, float] = (5, 10),
+    ) -> None:
+        self.rules = rules
+        # Used for hosts that aren't in rules, but have started returning 429s
+        self.fallback_rule = fallback_rule
+        self.buckets: dict[str, TokenBucket] = {}
+
+    def get_bucket(self, url: str, create: bool = False):
+        host = urlparse(url).hostname or ""
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            rule = self.rules.get(host)
+            if rule is None and create:
+                rule = self.fallback_rule
+            if rule:
+                bucket = TokenBucket(*rule)
+                self.buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str):
+        bucket = self.get_bucket(url)
+        if bucket:
+            await bucket.acquire()
+
+    def penalize(self, url: str, retry_after: float | None = None):
+        bucket = self.get_bucket(url, create=True)
+        assert bucket
+        return bucket.penalize(retry_after)
+
+    def reward(self, url: str):
+        bucket = self.get_bucket(url)
+        if bucket:
+            bucket.reward()
+
+    def remaining_tokens(self, url: str) -> float | None:
+        bucket = self.get_bucket(url)
+        return bucket.remaining() if bucket else None
+
+
+class RequestRetryError(Exception):
+    def __init__(self, url: str, state: RetryState, reason: str) -> None:
+        message = f"Gave up on {url} after {state.attempts} attempts ({reason})"
+        super().__init__(message)
+        self.url = url
+        self.state = state
+        self.reason = reason
+
+
+class RetryState:
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.retries = 0
+        self.started_at = time.monotonic()
+        self.last_status: int | None = None
+        self.last_exception: BaseException | None = None
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+
+class RetryPolicy:
+    # "retry" sends the request again after a backoff
+    # "return" hands the response back to the caller
+    # Anything else raises the ClientResponseError
+    STATUS_STRATEGIES: dict[int, str] = {
+        400: "return",
+        401: "return",
+        403: "return",
+        404: "return",
+        429: "retry",
+        500: "retry",
+        502: "retry",
+        503: "retry",
+        504: "retry",
+    }
+
+    def __init__(
+        self,
+        max_attempts: int = 10,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+        jitter: float = 1.0,
+        deadline: float | None = 600,
+        status_strategies: dict[int, str] | None = None,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # 0 = plain exponential backoff, 1 = full jitter
+        self.jitter = jitter
+        self.deadline = deadline
+        self.status_strategies = self.STATUS_STRATEGIES | (status_strategies or {})
+
+    def get_strategy(self, status: int):
+        return self.status_strategies.get(status, "raise")
+
+    def get_delay(self, attempt: int):
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempt - 1, 0))
+        return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+    def can_retry(self, state: RetryState, delay: float = 0):
+        if state.attempts >= self.max_attempts:
+            return False
+        if self.deadline is not None and state.elapsed() + delay > self.deadline:
+            return False
+        return True
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        limit: int = 0,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30,
+        ttl_dns_cache: int | None = 300,
+        share_connections: bool = True,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.share_connections = share_connections
+        # One connector per proxy (None = direct), shared by every SessionManager
+        self.connectors: dict[ProxyInfo | None, aiohttp.BaseConnector] = {}
+
+    def create_connector(self, proxy: ProxyInfo | None = None) -> aiohttp.BaseConnector:
+        options: dict[str, Any] = {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "ttl_dns_cache": self.ttl_dns_cache,
+            "use_dns_cache": self.ttl_dns_cache is not None,
+        }
+        if proxy:
+            return ProxyConnector(**proxy._asdict(), **options)  # type: ignore
+        return aiohttp.TCPConnector(**options)
+
+    def get_connector(self, proxy: ProxyInfo | None = None):
+        """Returns a connector and whether the caller owns (and should close) it"""
+        if not self.share_connections:
+            return self.create_connector(proxy), True
+        connector = self.connectors.get(proxy)
+        if connector is None or connector.closed:
+            connector = self.create_connector(proxy)
+            self.connectors[proxy] = connector
+        return connector, False
+
+    async def close(self):
+        for connector in self.connectors.values():
+            await connector.close()
+        self.connectors.clear()
 
 
 class SessionManager:
@@ -86,24 +292,48 @@ class SessionManager:
         self.proxies: list[str] = (
             proxies if proxies else auth.api.config.settings.proxies
         )
-        self.proxy_manager = ProxyManager(self)
+        self.connection_pool: ConnectionPool = auth.api.connection_pool
+        # Auths on the configured proxies share the api's pool and its health scores
+        self.owns_proxy_pool = bool(proxies)
+        self.proxy_pool: ProxyPool = (
+            ProxyPool(proxies, self.connection_pool) if proxies else auth.api.proxy_pool
+        )
         global_settings = auth.api.get_global_settings()
         dynamic_rules_link = (
             global_settings.dynamic_rules_link if global_settings else ""
         )
-        dr_link = dynamic_rules_link
-        dynamic_rules = requests.get(dr_link).json()  # type: ignore
-        self.dynamic_rules = dynamic_rules
+        # Shared by every auth, fetched on first use instead of blocking here
+        self.dynamic_rules_manager = DynamicRules.get_instance(
+            dynamic_rules_link,
+            auth.api.get_data_directory().joinpath("cache", "dynamic_rules"),
+        )
         self.auth = auth
         self.use_cookies: bool = use_cookies
-        self.active_session = self.create_client_session()
+        # Every proxy gets its own session, they share the cookies
+        self.cookie_jar = CookieJar()
+        self.proxy_sessions: dict[ProxyState | None, ClientSession] = {}
+        self.active_session = self.get_session(
+            self.proxy_pool.proxies[0] if self.proxy_pool else None
+        )
         self.request_count = 0
-        # self.last_request_time: float | None = None
-        # self.rate_limit_wait_minutes = 6
-        self.rate_limit_check = False
-        self.is_rate_limited = None
-        self.time2sleep = 0
-        asyncio.create_task(self.check_rate_limit())
+        self.rate_limiter = RateLimiter()
+        self.retry_policy = RetryPolicy(max_attempts=self.max_attempts)
+        self.retry_counters: dict[str, int] = {
+            "requests": 0,
+            "retries": 0,
+            "exhausted": 0,
+        }
+        # Identical GETs that are in flight at the same time share one request, None disables it
+        self.coalesce_key: Callable[[str], str | None] | None = default_coalesce_key
+        self.in_flight: dict[str, asyncio.Future[Any]] = {}
+        self.coalesced_requests = 0
+
+    @property
+    def dynamic_rules(self):
+        return self.dynamic_rules_manager.rules
+
+    async def get_dynamic_rules(self):
+        return await self.dynamic_rules_manager.get()
 
     def get_cookies(self):
         import ultima_scraper_api.apis.fansly.classes as fansly_classes
@@ -114,101 +344,47 @@ class SessionManager:
             final_cookies = self.auth.auth_details.cookie.format()
         return final_cookies
 
-    def test_proxies(self, proxies: list[str] = []):
-        final_proxies: list[str] = []
-
-        session = requests.Session()
-        proxies = proxies if proxies else self.proxies
-        for proxy in proxies:
-            url = "https://checkip.amazonaws.com"
-            temp_proxies = {"https": proxy}
-            try:
-                resp = session.get(url, proxies=temp_proxies)
-                ip = resp.text
-                ip = ip.strip()
-                final_proxies.append(proxy)
-            except Exception as _e:
-                continue
-        return final_proxies
+    async def test_proxies(self, proxies: list[str] = []):
+        """Health checks proxies concurrently
 
-    def create_client_session(
-        self, test_proxies: bool = True, proxy: ProxyInfo | None = None
-    ):
-        limit = 0
-        if test_proxies and self.proxies:
-            self.proxies = self.test_proxies()
-            if not self.proxies:
-                raise Exception("Unable to create session due to invalid proxies")
-        connector = (
-            self.proxy_manager.create_connection(proxy)
-            if self.proxies
-            else aiohttp.TCPConnector(limit=limit)
+        Returns:
+            list[str]: The proxies that work
+        """
+        proxy_pool = (
+            ProxyPool(proxies, self.connection_pool) if proxies else self.proxy_pool
         )
+        return [x.url for x in await proxy_pool.check_all()]
+
+    def create_client_session(self, proxy: ProxyState | None = None):
+        connector, connector_owner = self.proxy_pool.get_connector(proxy)
         final_cookies = self.get_cookies()
         # Had to remove final_cookies and cookies=final_cookies due to it conflicting with headers
         client_session = ClientSession(
             connector=connector,
+            connector_owner=connector_owner,
             cookies=final_cookies,
+            cookie_jar=self.cookie_jar,
         )
         return client_session
 
+    def get_session(self, proxy: ProxyState | None = None):
+        session = self.proxy_sessions.get(proxy)
+        if session is None or session.closed:
+            session = self.create_client_session(proxy)
+            self.proxy_sessions[proxy] = session
+        return session
+
+    async def close(self):
+        for session in self.proxy_sessions.values():
+            await session.close()
+        self.proxy_sessions.clear()
+        if self.owns_proxy_pool:
+            # Stops its health checks, the api closes the shared pool
+            await self.proxy_pool.close()
+
     def get_proxy(self) -> str:
-        proxies = self.proxies
-        proxy = self.proxies[randint(0, len(proxies) - 1)] if proxies else ""
-        return proxy
-
-    # async def limit_rate(self):
-    #     if self.auth.api.site_name == "OnlyFans":
-    #         # [OF] 1,000 requests every 5 minutes
-    #         # Can batch  =< 5,000 amount of requests, but will get rate limited and throw 429 error
-    #         MAX_REQUEST_LIMIT = 900  # 900 instead of 1,000 to be safe
-    #         rate_limit_wait_minutes = self.rate_limit_wait_minutes
-    #         RATE_LIMIT_WAIT_TIME = 60 * rate_limit_wait_minutes
-    #         if self.request_count >= MAX_REQUEST_LIMIT:
-    #             # Wait until 5 minutes have elapsed since last request
-    #             if self.last_request_time is not None:
-    #                 elapsed_time = time.time() - self.last_request_time
-    #                 if elapsed_time < RATE_LIMIT_WAIT_TIME:
-    #                     time2sleep = RATE_LIMIT_WAIT_TIME - elapsed_time
-    #                     print(time2sleep)
-    #                     await asyncio.sleep(time2sleep)
-    #             # Reset counter and timer
-    #             self.request_count = 0
-    #             self.last_request_time = None
-    #         self.request_count += 1
-    #         if self.last_request_time is None:
-    #             self.last_request_time = time.time()
-
-    async def check_rate_limit(self):
-        lock = asyncio.Lock()
-        while True:
-            rate_limit_count = 1
-            while self.rate_limit_check:
-                async with lock:
-                    try:
-                        url = "https://onlyfans.com/api2/v2/init"
-                        headers = await self.session_rules(url)
-                        headers["accept"] = "application/json, text/plain, */*"
-                        headers["Connection"] = "keep-alive"
-                        proxy_manager = self.proxy_manager
-                        if proxy_manager.proxies:
-                            await proxy_manager.proxy_switcher()
-                            print(proxy_manager.get_current_proxy().host)
-
-                        result = await self.active_session.get(url, headers=headers)
-                        result.raise_for_status()
-                        self.rate_limit_check = False
-                        self.is_rate_limited = None
-                        break
-                    except ClientResponseError as _e:
-                        if _e.status == 429:
-                            # Still rate limited, wait 5 seconds and retry
-                            self.is_rate_limited = True
-                            rate_limit_count += 1
-                    except Exception as _e:
-                        pass
-                await asyncio.sleep(self.time2sleep)
-            await asyncio.sleep(5)
+        proxy = self.proxy_pool.get_proxy()
+        return proxy.url if proxy else ""
 
     async def request(
         self,
@@ -217,11 +393,46 @@ class SessionManager:
         data: Any = {},
         premade_settings: str = "json",
         custom_cookies: str = "",
+        retry_state: RetryState | None = None,
+        extra_headers: dict[str, str] | None = None,
     ):
+        """Sends a request, retrying according to self.retry_policy
+
+        Args:
+            extra_headers (dict[str, str], optional): Added after the signed headers, e.g. conditional request headers.
+            retry_state (RetryState, optional): Pass one in to inspect the attempts made for this request.
+
+        Raises:
+            RequestRetryError: The policy ran out of attempts or time
+            ClientResponseError: The status has no strategy in the policy
+            ValueError: The method isn't GET, POST or DELETE
+        """
+        method = method.upper()
+        if method not in ("GET", "POST", "DELETE"):
+            raise ValueError(f"Unsupported method: {method}")
+        policy = self.retry_policy
+        state = retry_state if retry_state else RetryState()
+        self.retry_counters["requests"] += 1
         while True:
-            if self.rate_limit_check:
-                await asyncio.sleep(5)
-                continue
+            if state.attempts:
+                # 429s are already paced by the rate limiter
+                delay = (
+                    0 if state.last_status == 429 else policy.get_delay(state.attempts)
+                )
+                if not policy.can_retry(state, delay):
+                    self.retry_counters["exhausted"] += 1
+                    reason = (
+                        f"status {state.last_status}"
+                        if state.last_status
+                        else repr(state.last_exception)
+                    )
+                    raise RequestRetryError(url, state, reason)
+                state.retries += 1
+                self.retry_counters["retries"] += 1
+                await asyncio.sleep(delay)
+            state.attempts += 1
+            state.last_status = None
+            await self.rate_limiter.acquire(url)
             headers = {}
             if premade_settings == "json":
                 headers = await self.session_rules(url)
@@ -230,55 +441,129 @@ class SessionManager:
             if custom_cookies:
                 headers = await self.session_rules(url, custom_cookies=custom_cookies)
                 pass
+            if extra_headers:
+                headers.update(extra_headers)
 
-            # await self.limit_rate()
+            proxy_pool = self.proxy_pool
+            proxy = proxy_pool.get_proxy()
+            session = self.get_session(proxy)
+            started_at = time.monotonic()
             try:
-                match method.upper():
-                    case "GET":
-                        result = await self.active_session.get(url, headers=headers)
+                if proxy:
+                    proxy.in_flight += 1
+                match method:
                     case "POST":
-                        result = await self.active_session.post(
-                            url, headers=headers, data=data
-                        )
-            except EXCEPTION_TEMPLATE as _e:
-                continue
+                        result = await session.post(url, headers=headers, data=data)
+                    case "DELETE":
+                        result = await session.delete(url, headers=headers)
+                    case _:
+                        result = await session.get(url, headers=headers)
             except Exception as _e:
+                state.last_exception = _e
+                if proxy:
+                    proxy_pool.record(proxy, None, False)
                 continue
-            try:
-                result.raise_for_status()
+            finally:
+                if proxy:
+                    proxy.in_flight -= 1
+            if proxy:
+                # Server errors are the site's fault, not the proxy's
+                proxy_pool.record(proxy, time.monotonic() - started_at, True)
+            if result.ok:
+                self.request_count += 1
+                self.rate_limiter.reward(url)
                 return result
-            except EXCEPTION_TEMPLATE as _e:
-                # Can retry
-                continue
-            except ClientResponseError as _e:
-                match _e.status:
-                    case 400 | 401 | 403 | 404:
-                        return result
-                    case 429:
-                        pass
-                        if self.is_rate_limited is None:
-                            self.rate_limit_check = True
-                        continue
-                    case 500 | 503 | 504:
-                        continue
-                    case _:
-                        raise Exception(
-                            f"Infinite Loop Detected for unhandled status error: {_e.status}"
+            state.last_status = result.status
+            match policy.get_strategy(result.status):
+                case "return":
+                    # Not raise_for_status, it releases the response and the caller wants the error body
+                    return result
+                case "retry":
+                    if result.status == 429:
+                        retry_after = result.headers.get("Retry-After", "")
+                        retry_seconds = (
+                            float(retry_after) if retry_after.isdigit() else None
                         )
-            except Exception as _e:
-                pass
+                        penalized = self.rate_limiter.penalize(url, retry_seconds)
+                        if penalized and proxy and len(proxy_pool.proxies) > 1:
+                            # Only this proxy sits out, requests on the others carry on
+                            proxy_pool.penalize(proxy, retry_seconds)
+                    # Hand the connection back to the pool before trying again
+                    result.release()
+                    continue
+                case _:
+                    # Releases the connection before raising
+                    result.raise_for_status()
 
     async def bulk_requests(self, urls: list[str]) -> list[ClientResponse | None]:
         return await asyncio.gather(*[self.request(url) for url in urls])
 
-    async def json_request(self, url: str):
-        response = await self.request(url)
-        json_resp: dict[Any, Any] = {}
-        if response.status == 200:
-            json_resp = await response.json()
+    async def json_request(self, url: str, method: str = "GET", payload: Any = {}):
+        """Sends a request and decodes the json, concurrent GETs with the same coalesce_key share the request"""
+        key = (
+            self.coalesce_key(url)
+            if self.coalesce_key and method.upper() == "GET"
+            else None
+        )
+        if key is None:
+            return await self.fetch_json(url, method, payload)
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.fetch_body(url, method, payload))
+            self.in_flight[key] = future
+
+            def forget(finished_future: asyncio.Future[Any]):
+                if self.in_flight.get(key) is finished_future:
+                    del self.in_flight[key]
+
+            future.add_done_callback(forget)
         else:
-            json_resp["error"] = {"code": response.status, "message": response.reason}
-        return json_resp
+            self.coalesced_requests += 1
+        # A cancelled caller shouldn't cancel the request for everyone else
+        body = await asyncio.shield(future)
+        # Every caller decodes its own copy, so changes to nested results don't leak between them
+        return decode_json(body)
+
+    async def fetch_json(self, url: str, method: str = "GET", payload: Any = {}):
+        return decode_json(await self.fetch_body(url, method, payload))
+
+    async def fetch_body(self, url: str, method: str = "GET", payload: Any = {}):
+        """Sends a request and returns the json body, a failed request returns an encoded {"error": ...}"""
+        response_cache = self.auth.api.response_cache if method == "GET" else None
+        ttl = response_cache.get_ttl(url) if response_cache else None
+        cache_key = ""
+        cached_response = None
+        extra_headers: dict[str, str] = {}
+        if response_cache and ttl is not None:
+            # Responses depend on who's asking, so each auth gets its own keys
+            cache_key = response_cache.create_key(url, self.auth.id)
+            cached_response = response_cache.get(cache_key)
+            if cached_response:
+                if cached_response.is_fresh(ttl):
+                    return cached_response.body
+                extra_headers = cached_response.get_validators()
+        try:
+            response = await self.request(
+                url, method, data=payload, extra_headers=extra_headers
+            )
+        except (RequestRetryError, ClientResponseError) as _e:
+            return orjson.dumps({"error": request_error_details(_e)})
+        if response.status == 304 and response_cache and cached_response:
+            response_cache.revalidated(cache_key)
+            return cached_response.body
+        if response.status != 200:
+            response.release()
+            error = {"code": response.status, "message": response.reason}
+            return orjson.dumps({"error": error})
+        body = await response.read()
+        if response_cache and cache_key:
+            response_cache.set(
+                cache_key,
+                body,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        return body
 
     async def bulk_json_requests(self, urls: list[str]) -> list[dict[Any, Any]]:
         return await asyncio.gather(*[self.json_request(url) for url in urls])
@@ -298,10 +583,12 @@ class SessionManager:
 
         async with self.semaphore:
             headers = {}
-            custom_session = False
+            proxy_pool = self.proxy_pool
+            proxy = None
             if not session:
-                custom_session = True
-                session = self.create_client_session()
+                # Picked like request() picks them, so the pool's health scores apply here too
+                proxy = proxy_pool.get_proxy()
+                session = self.get_session(proxy)
             headers = await self.session_rules(link)
             headers["accept"] = "application/json, text/plain, */*"
             headers["Connection"] = "keep-alive"
@@ -328,16 +615,19 @@ class SessionManager:
             else:
                 return None
             while True:
+                started_at = time.monotonic()
                 try:
                     response = await request_method(
                         link, headers=headers, data=temp_payload
                     )
+                    if proxy:
+                        proxy_pool.record(proxy, time.monotonic() - started_at, True)
                     if method == "HEAD":
                         result = response
                     else:
                         if json_format and not stream:
                             # qwsd = list(response.request_info.headers.items())
-                            result = await response.json()
+                            result = decode_json(await response.read())
                             if "error" in result:
                                 extras: dict[str, Any] = {}
                                 extras["auth"] = self.auth
@@ -358,6 +648,8 @@ class SessionManager:
                             result = await response.read()
                     break
                 except (ClientConnectorError, ProxyError):
+                    if proxy:
+                        proxy_pool.record(proxy, None, False)
                     break
                 except (
                     ClientPayloadError,
@@ -370,8 +662,6 @@ class SessionManager:
                     continue
                 except Exception as _exception:
                     pass
-            if custom_session:
-                await session.close()
             return result
 
     async def session_rules(
@@ -382,6 +672,7 @@ class SessionManager:
 
         headers: dict[str, Any] = {}
         headers |= self.headers
+        await self.get_dynamic_rules()
         match self.auth.auth_details.__class__:
             case onlyfans_classes.extras.AuthDetails:
                 if "https://onlyfans.com/api2/v2/" in link:
@@ -396,8 +687,6 @@ class SessionManager:
                         )
                     headers2 = self.create_signed_headers(link)
                     headers |= headers2
-                    # t2s does not set for cdn links yet
-                    self.time2sleep = 5
                 elif ".mpd" in link:
                     headers["cookie"] = custom_cookies
                 else:
@@ -411,7 +700,6 @@ class SessionManager:
             case fansly_classes.extras.AuthDetails:
                 if "https://apiv3.fansly.com" in link:
                     headers["authorization"] = self.auth.auth_details.authorization
-                    self.is_rate_limited = False
             case _:
                 pass
         return headers
@@ -420,25 +708,5 @@ class SessionManager:
         self, link: str, auth_id: int = 0, time_: int | None = None
     ):
         # Users: 300000 | Creators: 301000
-        headers: dict[str, Any] = {}
-        final_time = str(int(round(time.time()))) if not time_ else str(time_)
-        path = urlparse(link).path
-        query = urlparse(link).query
-        if query:
-            auth_id = self.auth.id if self.auth.id else auth_id
-            headers["user-id"] = str(auth_id)
-        path = path if not query else f"{path}?{query}"
-        dynamic_rules = self.dynamic_rules
-        a = [dynamic_rules["static_param"], final_time, path, str(auth_id)]
-        msg = "\n".join(a)
-        message = msg.encode("utf-8")
-        hash_object = hashlib.sha1(message)
-        sha_1_sign = hash_object.hexdigest()
-        sha_1_b = sha_1_sign.encode("ascii")
-        checksum = (
-            sum([sha_1_b[number] for number in dynamic_rules["checksum_indexes"]])
-            + dynamic_rules["checksum_constant"]
-        )
-        headers["sign"] = dynamic_rules["format"].format(sha_1_sign, abs(checksum))
-        headers["time"] = final_time
-        return headers
+        signer = self.dynamic_rules_manager.get_signer()
+        return signer.sign(link, auth_id, self.auth.id or auth_id, time_)
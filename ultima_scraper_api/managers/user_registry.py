@@ -0,0 +1,64 @@
+from typing import Any, Generic, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class UserRegistry(Generic[T]):
+    """Users indexed by id and lowercase username
+
+    Users added here are also added to the parent registry (e.g. the api's), so every auth shares one lookup.
+    """
+
+    def __init__(self, parent: "UserRegistry[T] | None" = None) -> None:
+        self.parent = parent
+        self.by_id: dict[Any, T] = {}
+        self.by_username: dict[str, T] = {}
+        # id(user): (id, username) it was indexed under, so renamed users can be reindexed
+        self.indexed_keys: dict[int, tuple[Any, str | None]] = {}
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(list(self.by_id.values()))
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, user: Any):
+        return getattr(user, "id", None) in self.by_id
+
+    def add(self, user: T):
+        """Indexes the user, calling it again after the id or username changes will reindex it
+
+        An existing user with the same id is kept, like set.add.
+        """
+        user_id = getattr(user, "id", None)
+        username: str | None = getattr(user, "username", None)
+        username = username.lower() if username else None
+        if self.indexed_keys.get(id(user)) == (user_id, username):
+            return
+        self.discard(user)
+        indexed = False
+        if user_id is not None:
+            indexed |= self.by_id.setdefault(user_id, user) is user
+        if username:
+            indexed |= self.by_username.setdefault(username, user) is user
+        if indexed:
+            self.indexed_keys[id(user)] = (user_id, username)
+        if self.parent is not None:
+            self.parent.add(user)
+
+    def unindex(self, user: T, user_id: Any, username: str | None):
+        if self.by_id.get(user_id) is user:
+            del self.by_id[user_id]
+        if username and self.by_username.get(username) is user:
+            del self.by_username[username]
+
+    def discard(self, user: T):
+        old_keys = self.indexed_keys.pop(id(user), None)
+        if old_keys:
+            self.unindex(user, *old_keys)
+
+    def find(self, identifier: int | str) -> T | None:
+        user = self.by_id.get(identifier)
+        if user is None and isinstance(identifier, str):
+            user = self.by_username.get(identifier.lower())
+        return user
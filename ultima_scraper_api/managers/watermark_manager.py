@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+
+class WatermarkManager:
+    """Keeps the newest content seen per user and content type, so incremental scrapes know where to stop
+
+    OnlyFans posts are tracked by postedAtPrecise (pinned posts break id ordering), everything else by id.
+    Watermarks are also keyed by auth_id, what a user's content looks like depends on who's looking.
+    Only move a watermark after a crawl that reached the end or the previous watermark, or the rest is skipped for good.
+    """
+
+    def __init__(self, filepath: Path | None = None) -> None:
+        self.filepath = filepath
+        self.watermarks: dict[str, dict[str, Any]] = {}
+        if filepath:
+            self.load(filepath)
+
+    def load(self, filepath: Path):
+        self.filepath = filepath
+        if filepath.exists() and filepath.stat().st_size:
+            self.watermarks = orjson.loads(filepath.read_bytes())
+        return self
+
+    def save(self):
+        if not self.filepath:
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        temp_filepath = self.filepath.with_suffix(".tmp")
+        temp_filepath.write_bytes(
+            orjson.dumps(self.watermarks, option=orjson.OPT_INDENT_2)
+        )
+        temp_filepath.replace(self.filepath)
+
+    @staticmethod
+    def get_key(user_id: int, auth_id: int | None = None):
+        return str(user_id) if auth_id is None else f"{auth_id}:{user_id}"
+
+    def get(self, user_id: int, content_type: str, auth_id: int | None = None) -> Any:
+        return self.watermarks.get(self.get_key(user_id, auth_id), {}).get(content_type)
+
+    def update(
+        self,
+        user_id: int,
+        content_type: str,
+        value: Any,
+        auth_id: int | None = None,
+    ):
+        """Moves the watermark forward, older values are ignored
+
+        Returns:
+            bool: True if the watermark changed
+        """
+        if value is None:
+            return False
+        current_value = self.get(user_id, content_type, auth_id)
+        if current_value is not None and float(value) <= float(current_value):
+            return False
+        key = self.get_key(user_id, auth_id)
+        self.watermarks.setdefault(key, {})[content_type] = value
+        return True
+
+    def set(
+        self,
+        user_id: int,
+        content_type: str,
+        value: Any,
+        auth_id: int | None = None,
+    ):
+        """Replaces the watermark, for content that isn't ordered by a number (e.g. paid content keys)"""
+        key = self.get_key(user_id, auth_id)
+        self.watermarks.setdefault(key, {})[content_type] = value
+
+    def reset(
+        self,
+        user_id: int,
+        content_type: str | None = None,
+        auth_id: int | None = None,
+    ):
+        user_watermarks = self.watermarks.get(self.get_key(user_id, auth_id), {})
+        if content_type:
+            user_watermarks.pop(content_type, None)
+        else:
+            user_watermarks.clear()
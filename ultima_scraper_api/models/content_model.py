@@ -0,0 +1,60 @@
+from typing import Any, Callable, Generic, TypeVar, overload
+
+T = TypeVar("T")
+
+
+class RawField(Generic[T]):
+    """Reads an attribute straight from the instance's __raw__ payload instead of copying it
+
+    Content models hold thousands of items, so they keep the payload once and expose its keys through these.
+    The payload can be shared with other models built from the same response, so it's never written to,
+    assigned values and created defaults go into the instance's __overrides__ dict instead.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        default: Any = None,
+        default_factory: Callable[[], Any] | None = None,
+        convert: Callable[[Any], T] | None = None,
+    ) -> None:
+        """
+        Args:
+            default_factory (Callable, optional): For mutable defaults, the value is stored in __overrides__ the first time it's read.
+            convert (Callable, optional): Applied to the value on every read.
+        """
+        self.key = key
+        self.default = default
+        self.default_factory = default_factory
+        self.convert = convert
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> "RawField[T]": ...
+
+    @overload
+    def __get__(self, instance: object, owner: type) -> T: ...
+
+    def __get__(self, instance: object | None, owner: type) -> "RawField[T] | T":
+        if instance is None:
+            return self
+        overrides: dict[str, Any] | None = instance.__overrides__  # type: ignore
+        if overrides and self.key in overrides:
+            value = overrides[self.key]
+        elif self.default_factory:
+            value = instance.__raw__.get(self.key)  # type: ignore
+            if value is None:
+                value = self.default_factory()
+                self.__set__(instance, value)
+        else:
+            value = instance.__raw__.get(self.key, self.default)  # type: ignore
+        return self.convert(value) if self.convert else value
+
+    def __set__(self, instance: object, value: T):
+        overrides: dict[str, Any] | None = instance.__overrides__  # type: ignore
+        if overrides is None:
+            instance.__overrides__ = {self.key: value}  # type: ignore
+        else:
+            overrides[self.key] = value